@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='todo',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['-created_at', '-id'], name='todo_created_id_idx'),
+        ),
+    ]
@@ -11,7 +11,11 @@ class Todo(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Backs the list view's keyset pagination
+            models.Index(fields=['-created_at', '-id'], name='todo_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
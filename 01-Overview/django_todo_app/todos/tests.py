@@ -2,8 +2,10 @@ from django.test import TestCase, Client
 from django.urls import reverse
 from django.utils import timezone
 from datetime import date, timedelta
+from unittest import mock
 from .models import Todo
 from .forms import TodoForm
+from .views import TodoListView
 
 
 class TodoModelTest(TestCase):
@@ -95,6 +97,57 @@ class TodoViewTest(TestCase):
         self.assertEqual(response.context['pending_count'], 1)
         self.assertEqual(response.context['resolved_count'], 1)
     
+    def test_todo_list_view_counts_cover_all_pages(self):
+        """Test that counts include TODOs beyond the first page"""
+        for i in range(3):
+            Todo.objects.create(title=f"Done {i}", is_resolved=True)
+        with mock.patch.object(TodoListView, 'page_size', 2):
+            response = self.client.get(reverse('todo_list'))
+        self.assertEqual(len(response.context['todos']), 2)
+        self.assertEqual(response.context['pending_count'], 1)
+        self.assertEqual(response.context['resolved_count'], 3)
+    
+    def test_todo_list_view_keyset_pages(self):
+        """Test that following next_cursor walks every TODO once, newest first"""
+        for i in range(4):
+            Todo.objects.create(title=f"TODO {i}")
+        expected = list(Todo.objects.values_list('pk', flat=True))
+        seen = []
+        params = {}
+        with mock.patch.object(TodoListView, 'page_size', 2):
+            while True:
+                response = self.client.get(reverse('todo_list'), params)
+                seen.extend(todo.pk for todo in response.context['todos'])
+                if not response.context['next_cursor']:
+                    break
+                params = {'after': response.context['next_cursor']}
+        self.assertEqual(seen, expected)
+    
+    def test_todo_list_view_ties_on_created_at(self):
+        """Test that TODOs sharing a timestamp are split across pages by id"""
+        now = timezone.now()
+        Todo.objects.all().delete()
+        todos = [Todo.objects.create(title=f"Same {i}", created_at=now) for i in range(3)]
+        with mock.patch.object(TodoListView, 'page_size', 2):
+            first = self.client.get(reverse('todo_list'))
+            second = self.client.get(reverse('todo_list'), {'after': first.context['next_cursor']})
+        self.assertEqual([t.pk for t in first.context['todos']], [todos[2].pk, todos[1].pk])
+        self.assertEqual([t.pk for t in second.context['todos']], [todos[0].pk])
+        self.assertIsNone(second.context['next_cursor'])
+    
+    def test_todo_list_view_invalid_cursor_shows_first_page(self):
+        """Test that a malformed cursor falls back to the first page"""
+        response = self.client.get(reverse('todo_list'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Test TODO")
+    
+    def test_todo_list_view_query_count(self):
+        """Test that the list page runs one query for rows and one for counts"""
+        for i in range(10):
+            Todo.objects.create(title=f"TODO {i}", is_resolved=i % 2 == 0)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('todo_list'))
+    
     def test_todo_create_view_get(self):
         """Test GET request to create view"""
         response = self.client.get(reverse('todo_create'))
@@ -1,20 +1,60 @@
+from django.db.models import Count, Q
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.dateparse import parse_datetime
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from .models import Todo
 from .forms import TodoForm
 
 
+def encode_cursor(todo):
+    """Cursor pointing just past a todo in (created_at, id) order"""
+    return f"{todo.created_at.isoformat()}|{todo.pk}"
+
+
+def decode_cursor(value):
+    """(created_at, id) from a cursor, or None if it is missing or malformed"""
+    created_at, _, pk = (value or '').rpartition('|')
+    created_at = parse_datetime(created_at) if created_at else None
+    if created_at is None or not pk.isdigit():
+        return None
+    return created_at, int(pk)
+
+
 class TodoListView(ListView):
+    """Newest-first todo list with keyset pagination
+
+    Pages continue from the (created_at, id) of the last row shown, so each
+    page is an index range scan instead of an OFFSET over every earlier row.
+    """
     model = Todo
     template_name = 'todos/todo_list.html'
     context_object_name = 'todos'
+    page_size = 50
+
+    def get_queryset(self):
+        queryset = super().get_queryset().order_by('-created_at', '-id')
+        cursor = decode_cursor(self.request.GET.get('after'))
+        if cursor:
+            created_at, pk = cursor
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+        return queryset
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        todos = self.get_queryset()
-        context['resolved_count'] = todos.filter(is_resolved=True).count()
-        context['pending_count'] = todos.filter(is_resolved=False).count()
+        # One extra row tells us whether there is a next page
+        todos = list(self.object_list[:self.page_size + 1])
+        has_next = len(todos) > self.page_size
+        todos = todos[:self.page_size]
+        context = super().get_context_data(object_list=todos, **kwargs)
+        context['next_cursor'] = encode_cursor(todos[-1]) if has_next else None
+        context['is_first_page'] = 'after' not in self.request.GET
+        # Both counts in a single query
+        context.update(Todo.objects.aggregate(
+            resolved_count=Count('pk', filter=Q(is_resolved=True)),
+            pending_count=Count('pk', filter=Q(is_resolved=False)),
+        ))
         return context
 
 
@@ -1,3 +1,3 @@
-from .config import settings
+from .config import Settings, configure, settings
 
-__all__ = ["settings"]
+__all__ = ["Settings", "configure", "settings"]
@@ -0,0 +1,148 @@
+"""
+Blocking-call detector for the event loop
+
+A heartbeat callback on the loop stamps the time every few milliseconds
+and a watchdog thread checks the stamp. When the loop misses its heartbeat
+by more than the threshold, the watchdog captures the loop thread's stack
+while the offending code is still running; once the loop comes back the
+stall is logged with its duration and aggregated by call site (the
+innermost frame in this project, so a bcrypt hash reports the route that
+called it rather than passlib). Stalls inside the import system are
+skipped: a module imported lazily on first use blocks once, not per request.
+
+Meant for debug and staging (blocking_detector_enabled); tests can use
+assert_no_blocking to fail when a route stalls the loop.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import anyio.to_thread
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = str(Path(__file__).resolve().parents[2])
+
+def _call_site(stack: traceback.StackSummary) -> traceback.FrameSummary:
+    for frame in reversed(stack):
+        if frame.filename.startswith(PROJECT_ROOT) and frame.filename != __file__:
+            return frame
+    return stack[-1]
+
+def _importing(stack: traceback.StackSummary) -> bool:
+    return any(frame.filename.startswith("<frozen importlib") for frame in stack)
+
+class BlockingDetector:
+    """Watches one event loop for callbacks that hold it longer than threshold"""
+    
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold or settings.blocking_threshold
+        self.interval = min(0.01, self.threshold / 4)
+        self.offenders: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._last = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def start(self) -> None:
+        """Start watching the running loop (call from the loop thread)"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._tick()
+        self._thread = threading.Thread(target=self._watch, name="blocking-detector", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _tick(self) -> None:
+        self._last = time.monotonic()
+        self._handle = self._loop.call_later(self.interval, self._tick)
+    
+    def _watch(self) -> None:
+        stalled_since = seen = None
+        stack = None
+        while not self._stop.wait(self.interval):
+            last = self._last
+            if stalled_since is not None:
+                if last != seen:
+                    # The loop is back; the heartbeat ran as soon as it could
+                    self._record(stack, last - stalled_since)
+                    stalled_since = None
+                continue
+            if time.monotonic() - last - self.interval > self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                stalled_since = last + self.interval
+                seen = last
+    
+    def _record(self, stack: traceback.StackSummary, duration: float) -> None:
+        if _importing(stack):
+            logger.debug("Event loop blocked for %.0f ms importing a module", duration * 1000)
+            return
+        site = _call_site(stack)
+        key = f"{site.filename}:{site.lineno} in {site.name}"
+        with self._lock:
+            offender = self.offenders.setdefault(key, {"count": 0, "total": 0.0, "max": 0.0})
+            offender["count"] += 1
+            offender["total"] += duration
+            offender["max"] = max(offender["max"], duration)
+            offender["stack"] = "".join(stack.format())
+        logger.warning(
+            "Event loop blocked for %.0f ms at %s\n%s", duration * 1000, key, offender["stack"],
+        )
+    
+    def report(self) -> List[dict]:
+        """Offenders by call site, worst total blocking time first"""
+        with self._lock:
+            rows = [{"site": key, **offender} for key, offender in self.offenders.items()]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+    
+    def format_report(self) -> str:
+        lines = []
+        for row in self.report():
+            lines.append(
+                f"{row['site']}: blocked {row['count']}x, "
+                f"max {row['max'] * 1000:.0f} ms, total {row['total'] * 1000:.0f} ms"
+            )
+            lines.append(row["stack"])
+        return "\n".join(lines)
+
+@asynccontextmanager
+async def assert_no_blocking(threshold: float = 0.05):
+    """Fail if anything inside the block holds the event loop longer than threshold
+
+        async with assert_no_blocking():
+            await client.get("/api/problems/")
+    """
+    # Start the threadpool and let pending callbacks run before watching, so
+    # one-off startup cost is not reported against the code under test
+    await anyio.to_thread.run_sync(lambda: None)
+    await asyncio.sleep(0)
+    detector = BlockingDetector(threshold)
+    detector.start()
+    try:
+        yield detector
+        # Give the watchdog time to see a stall that ended just now
+        await asyncio.sleep(detector.interval * 3)
+    finally:
+        detector.stop()
+    if detector.offenders:
+        raise AssertionError("event loop was blocked:\n" + detector.format_report())
@@ -0,0 +1,139 @@
+import zlib
+from typing import Iterable, List, Optional, Tuple
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+def _accepted(header: bytes, coding: bytes) -> bool:
+    """Whether an Accept-Encoding header allows coding (q=0 refuses it)"""
+    for item in header.lower().split(b","):
+        name, _, params = item.partition(b";")
+        if name.strip() in (coding, b"*"):
+            params = params.strip()
+            if not params.startswith(b"q="):
+                return True
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+class _GzipEncoder:
+    name = b"gzip"
+    
+    def __init__(self, level: int):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class _BrotliEncoder:
+    name = b"br"
+    
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + (self._compressor.finish() if final else self._compressor.flush())
+
+class CompressionMiddleware:
+    """ASGI middleware compressing text-like responses above a size threshold
+
+    Complete bodies smaller than minimum_size go out untouched, since the
+    headers and CPU cost more than the bytes saved. Streamed bodies are
+    compressed chunk by chunk with a sync flush, so NDJSON and streamed JSON
+    arrays still reach the client incrementally.
+    """
+    
+    def __init__(
+        self,
+        app,
+        minimum_size: Optional[int] = None,
+        level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+        content_types: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.compression_minimum_size if minimum_size is None else minimum_size
+        self.level = settings.compression_level if level is None else level
+        self.brotli_quality = settings.compression_brotli_quality if brotli_quality is None else brotli_quality
+        types = settings.compression_content_types if content_types is None else content_types
+        self.content_types = {t.encode() for t in types}
+    
+    def _encoder(self, scope):
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                if brotli is not None and _accepted(value, b"br"):
+                    return lambda: _BrotliEncoder(self.brotli_quality)
+                if _accepted(value, b"gzip"):
+                    return lambda: _GzipEncoder(self.level)
+                return None
+        return None
+    
+    def _compressible(self, start) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        content_type = None
+        for name, value in start.get("headers", []):
+            if name == b"content-encoding":
+                return False  # already encoded (e.g. precompressed assets)
+            if name == b"content-type":
+                content_type = value.split(b";", 1)[0].strip().lower()
+        return content_type in self.content_types
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        make_encoder = self._encoder(scope)
+        if make_encoder is None:
+            await self.app(scope, receive, send)
+            return
+        
+        start = None
+        encoder = None
+        
+        async def send_compressed(message):
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                start = message
+                if not self._compressible(message):
+                    start = None
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or (start is None and encoder is None):
+                await send(message)
+                return
+            
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers: List[Tuple[bytes, bytes]] = [
+                    (name, value) for name, value in start.get("headers", [])
+                    if name != b"content-length"
+                ]
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body and len(body) < self.minimum_size:
+                    await send({**start, "headers": headers + [(b"content-length", str(len(body)).encode())]})
+                    start = None
+                    await send(message)
+                    return
+                encoder = make_encoder()
+                body = encoder.compress(body, final=not more_body)
+                headers.append((b"content-encoding", encoder.name))
+                if not more_body:
+                    headers.append((b"content-length", str(len(body)).encode()))
+                await send({**start, "headers": headers})
+                start = None
+            else:
+                body = encoder.compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+        
+        await self.app(scope, receive, send_compressed)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Callable, List, Optional
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -7,14 +7,38 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     debug: bool = True
     
+    # Production server (python -m app.server)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: Optional[int] = None  # defaults to the CPUs available, or 1 with the memory pub/sub
+    server_max_requests: int = 10000  # recycle a worker after this many requests
+    server_max_requests_jitter: int = 1000  # spread recycling so workers don't restart together
+    server_graceful_timeout: int = 30  # seconds to drain in-flight requests on SIGTERM
+    
     # Database
     database_url: str = "sqlite:///./interview.db"
+    sqlite_busy_timeout: float = 30.0  # seconds a SQLite writer waits for the database lock
     
     # JWT
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Password hashing
+    bcrypt_rounds: int = 12  # changing this rehashes passwords on next login
+    password_hash_workers: Optional[int] = None  # defaults to CPU count
+    login_max_concurrent: int = 2  # in-flight logins per account / per IP
+    
+    # Auth caches
+    token_cache_size: int = 10000  # verified tokens kept until they expire
+    user_cache_ttl: float = 30.0  # seconds a loaded user / access check is reused
+    user_cache_size: int = 10000  # users and interviews kept by the access caches
+    
+    # Token revocation
+    revocation_sync_interval: float = 5.0  # seconds between denylist syncs across workers
+    revocation_sync_overlap: float = 60.0  # seconds of recent revocations re-read on every sync
+    revocation_prune_interval: float = 3600.0  # seconds between dropping expired revocations
+    
     # CORS
     allowed_origins: list = [
         "http://localhost:3000",
@@ -25,12 +49,115 @@ class Settings(BaseSettings):
     # Redis (for caching and sessions)
     redis_url: str = "redis://localhost:6379/0"
     
+    # Rate limiting ("<requests>/<second|minute|hour>")
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # memory | redis (uses redis_url)
+    rate_limit_login: str = "10/minute"
+    rate_limit_register: str = "5/minute"
+    rate_limit_execute: str = "30/minute"
+    
+    # Response compression
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # bytes; smaller complete bodies are sent as-is
+    compression_level: int = 6  # gzip 1-9
+    compression_brotli_quality: int = 4  # brotli 0-11, used when brotli is installed
+    compression_content_types: list = [
+        "application/json",
+        "application/x-ndjson",
+        "text/plain",
+        "text/html",
+        "text/css",
+        "application/javascript",
+    ]
+    stream_batch_size: int = 100  # rows fetched and encoded per chunk of streamed lists
+    
+    # WebSocket collaboration
+    ws_send_queue_size: int = 256  # pending frames per connection before dropping
+    ws_document_history: int = 500  # applied ops kept for rebasing late deltas
+    ws_checksum_interval: int = 50  # versions between resync checksums
+    ws_presence_rate: float = 10.0  # coalesced presence frames per second per room
+    ws_replay_buffer: int = 500  # recent room events kept for reconnecting clients
+    ws_room_idle_ttl: float = 300.0  # seconds an empty room keeps its state
+    
+    # Room pub/sub across workers
+    pubsub_backend: str = "memory"  # memory | redis (uses redis_url) | local (unix socket)
+    pubsub_socket_path: str = "/tmp/interview-pubsub.sock"
+    pubsub_batch_size: int = 64  # messages per channel before an early flush
+    pubsub_batch_interval: float = 0.002  # seconds messages wait to be batched
+    pubsub_sync_timeout: float = 0.5  # seconds a new room waits for state from peers
+    
     # Code execution
     max_execution_time: int = 30  # seconds
     max_memory: int = 512  # MB
+    execution_concurrency: Optional[int] = None  # child processes at once, defaults to CPU count
+    
+    # Load shedding (pressure is each signal divided by its threshold)
+    load_shed_enabled: bool = True
+    load_shed_interval: float = 0.1  # seconds between pressure samples
+    load_shed_loop_lag: float = 0.1  # seconds the event loop wakes up late
+    load_shed_threadpool: float = 0.9  # fraction of threadpool workers busy
+    load_shed_execution_queue: int = 16  # executions waiting for a slot
+    load_shed_retry_after: int = 2  # seconds, multiplied by the shedding level
+    
+    # Blocking-call detection for debug/staging (logs stacks of loop stalls)
+    blocking_detector_enabled: bool = False
+    blocking_threshold: float = 0.1  # seconds one callback may hold the event loop
+    
+    # Submission judging
+    judge_workers: int = 2  # submissions judged at once per process
+    judge_output_limit: int = 1024  # characters of output/expected kept per test result
+    judge_claim_timeout: int = 600  # seconds a running solution stays claimed before it is requeued
+    
+    # Metrics
+    metrics_enabled: bool = True
+    
+    # Request profiling (the middleware is not installed unless enabled)
+    profiling_enabled: bool = False
+    profiling_token: Optional[str] = None  # X-Profile header value that profiles a request
+    profiling_sample_rate: float = 0.0  # fraction of other requests profiled
+    profiling_interval: float = 0.001  # seconds between stack samples
+    profiling_dir: str = "./profiles"
+    
+    # Blob store (content-addressed test case payloads)
+    blob_store_path: str = "./blobs"
+    test_case_inline_limit: int = 4096  # bytes of a visible payload also kept inline for the UI
+    
+    # Message ingestion (write-behind batching)
+    message_batch_size: int = 200
+    message_flush_interval: float = 1.0  # seconds
+    message_flush_retries: int = 3  # failed batch flushes before rows are inserted one by one
+    
+    # Code snapshot history
+    snapshot_keyframe_interval: int = 50  # deltas between full keyframes
+    snapshot_head_cache_size: int = 1000  # latest code kept per (interview, user)
+    snapshot_write_attempts: int = 3  # tries when another worker takes the same seq
     
     class Config:
         env_file = ".env"
         case_sensitive = False
 
 settings = Settings()
+
+_resets: List[Callable[[], None]] = []
+
+def on_configure(reset: Callable[[], None]) -> Callable[[], None]:
+    """Register a function that configure() calls after copying new settings"""
+    _resets.append(reset)
+    return reset
+
+def rebuilt_on_configure(accessor):
+    """Mark an lru_cache'd accessor whose object is built from settings
+
+    configure() clears its cache, so the next call rebuilds it with the new
+    values instead of keeping the ones read at first use.
+    """
+    on_configure(accessor.cache_clear)
+    return accessor
+
+def configure(new_settings: Settings) -> Settings:
+    """Copy new_settings onto the shared settings object used across the app"""
+    for name in Settings.model_fields:
+        setattr(settings, name, getattr(new_settings, name))
+    for reset in _resets:
+        reset()
+    return settings
@@ -1,25 +1,55 @@
-from sqlalchemy import create_engine
+from typing import Optional
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.pool import StaticPool
 from .config import settings
 
-# Use SQLite for development/testing
-SQLALCHEMY_DATABASE_URL = settings.database_url
+# The engine is created on first use (normally the app's lifespan startup),
+# so importing models and routes does not open a connection pool
+engine = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+Base = declarative_base()
 
-if "sqlite" in SQLALCHEMY_DATABASE_URL:
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
+def _configure_sqlite(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout * 1000)}")
+    cursor.close()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+def init_engine(database_url: Optional[str] = None):
+    """Create the engine and bind SessionLocal to it"""
+    global engine
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.pool import StaticPool
+    
+    url = make_url(database_url or settings.database_url)
+    if url.get_backend_name() != "sqlite":
+        engine = create_engine(url, pool_pre_ping=True)
+    elif url.database in (None, "", ":memory:"):
+        # Every connection would get its own empty in-memory database, so
+        # all threads share one
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    else:
+        # A connection per thread like any other database; WAL lets readers
+        # run alongside the writer, and writers wait for the lock instead of
+        # failing at once
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", _configure_sqlite)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+def get_engine():
+    """Get the engine, creating it if the app has not started it yet"""
+    if engine is None:
+        return init_engine()
+    return engine
 
 def get_db():
     """Get database session"""
+    get_engine()
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,84 @@
+from functools import lru_cache
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import rebuilt_on_configure, settings
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models import Interview, User
+
+@rebuilt_on_configure
+@lru_cache(maxsize=None)
+def get_user_cache() -> TTLCache:
+    """Detached User rows; merged into the request's session without a query"""
+    return TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+
+@rebuilt_on_configure
+@lru_cache(maxsize=None)
+def get_participants_cache() -> TTLCache:
+    """interview_id -> (interviewer_id, candidate_id)"""
+    return TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl)
+
+def invalidate_user(user_id: int) -> None:
+    """Forget a cached user after it changes"""
+    get_user_cache().pop(user_id)
+
+def invalidate_interview(interview_id: int) -> None:
+    """Forget cached participants after an interview changes"""
+    get_participants_cache().pop(interview_id)
+
+def get_current_active_user(
+    current_user_id: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """Load the authenticated user once per request"""
+    user_id = int(current_user_id)
+    user_cache = get_user_cache()
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return db.merge(cached, load=False)
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db.expunge(user)
+    user_cache.set(user_id, user)
+    return db.merge(user, load=False)
+
+def get_interview_participants(db: Session, interview_id: int):
+    """Get (interviewer_id, candidate_id) for an interview, or None"""
+    participants_cache = get_participants_cache()
+    participants = participants_cache.get(interview_id)
+    if participants is not None:
+        return participants
+    row = db.query(Interview.interviewer_id, Interview.candidate_id).filter(
+        Interview.id == interview_id
+    ).first()
+    if row is None:
+        return None
+    participants = (row.interviewer_id, row.candidate_id)
+    participants_cache.set(interview_id, participants)
+    return participants
+
+def require_interview_access(
+    interview_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """Resolve the current user and check they take part in the interview"""
+    participants = get_interview_participants(db, interview_id)
+    if participants is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Interview not found"
+        )
+    if current_user.id not in participants:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this interview"
+        )
+    return current_user
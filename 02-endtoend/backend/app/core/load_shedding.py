@@ -0,0 +1,183 @@
+"""
+Admission control driven by event loop lag and executor saturation
+
+A monitor task samples three pressure signals every load_shed_interval:
+how late the event loop wakes up, how many threadpool workers are busy,
+and how many code executions are waiting for a slot. Each is divided by
+its threshold and the largest ratio is the instance's pressure. At 1x the
+middleware sheds low-priority work (new code runs, listings); at 2x it
+sheds everything that is not critical (auth, health, and traffic for
+interviews already in progress). Shed requests get 503 with Retry-After,
+and /health/ready reports the instance as not ready so load balancers
+route new traffic elsewhere; /health stays 200, since restarting an
+overloaded instance would only make things worse.
+
+"In progress" is judged from the path alone: any request on an existing
+interview that is not a listing or a code run counts, whatever the
+interview's status. Looking the status up would cost a database query per
+request at exactly the moment the instance is short of capacity.
+"""
+
+import asyncio
+import logging
+import re
+from typing import List, Optional, Pattern, Tuple
+import anyio.to_thread
+from .config import settings
+from .metrics import code_executions_waiting, registry
+
+logger = logging.getLogger(__name__)
+
+CRITICAL, NORMAL, LOW = 0, 1, 2
+PRIORITY_NAMES = {CRITICAL: "critical", NORMAL: "normal", LOW: "low"}
+
+# First match wins; anything unmatched is NORMAL
+DEFAULT_RULES: List[Tuple[int, Optional[str], str]] = [
+    (CRITICAL, None, r"^/(health|health/ready|metrics)$"),
+    (CRITICAL, None, r"^/api/auth/"),
+    (LOW, "POST", r"^/api/interviews/\d+/execute$"),
+    (LOW, "GET", r"^/api/problems/?$"),
+    (LOW, "GET", r"^/api/interviews/user/\d+$"),
+    (LOW, "GET", r"^/api/interviews/\d+/(solutions|messages)$"),
+    (LOW, "GET", r"^/api/interviews/\d+/snapshots/\d+/replay$"),
+    # Everything else on an existing interview is treated as an interview in
+    # progress (an approximation: the interview's status is not checked)
+    (CRITICAL, None, r"^/api/interviews/\d+(/|$)"),
+]
+
+requests_shed = registry.counter(
+    "requests_shed_total", "Requests rejected by load shedding", ("priority",),
+)
+
+class LoadShedder:
+    """Tracks instance pressure and decides which requests to admit"""
+    
+    # Leave a level only once pressure drops this far below its threshold
+    HYSTERESIS = 0.8
+    
+    def __init__(self):
+        self.level = 0  # 0 admits everything, 1 sheds LOW, 2 sheds LOW and NORMAL
+        self.loop_lag = 0.0
+        self.threadpool_utilization = 0.0
+        self.execution_queue = 0
+        self.pressure = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def ready(self) -> bool:
+        return self.level == 0
+    
+    def admits(self, priority: int) -> bool:
+        if self.level == 0:
+            return True
+        return priority < LOW if self.level == 1 else priority == CRITICAL
+    
+    def update(self, loop_lag: float, threadpool_utilization: float, execution_queue: int) -> int:
+        """Record a sample and recompute the shedding level"""
+        # React to spikes at once, recover gradually
+        self.loop_lag = loop_lag if loop_lag > self.loop_lag else 0.7 * self.loop_lag + 0.3 * loop_lag
+        self.threadpool_utilization = threadpool_utilization
+        self.execution_queue = execution_queue
+        self.pressure = max(
+            self.loop_lag / settings.load_shed_loop_lag,
+            threadpool_utilization / settings.load_shed_threadpool,
+            execution_queue / settings.load_shed_execution_queue,
+        )
+        level = min(2, int(self.pressure))
+        if level < self.level and self.pressure > self.level * self.HYSTERESIS:
+            level = self.level
+        if level != self.level:
+            log = logger.warning if level > self.level else logger.info
+            log("Load shedding level %d -> %d (pressure %.2f)", self.level, level, self.pressure)
+            self.level = level
+        return level
+    
+    def snapshot(self) -> dict:
+        return {
+            "level": self.level,
+            "pressure": round(self.pressure, 3),
+            "loop_lag_ms": round(self.loop_lag * 1000, 2),
+            "threadpool_utilization": round(self.threadpool_utilization, 3),
+            "execution_queue": self.execution_queue,
+        }
+    
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._monitor())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.level = 0
+    
+    async def _monitor(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.load_shed_interval
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - started - interval)
+            utilization = limiter.borrowed_tokens / limiter.total_tokens
+            waiting = int(code_executions_waiting.labels().get())
+            self.update(lag, utilization, waiting)
+
+load_shedder = LoadShedder()
+
+@registry.collector
+def _load_metrics():
+    return [
+        ("load_shed_level", "gauge", "0 admits all, 1 sheds low priority, 2 sheds all but critical",
+         [("load_shed_level", {}, load_shedder.level)]),
+        ("event_loop_lag_seconds", "gauge", "Smoothed event loop wake-up delay",
+         [("event_loop_lag_seconds", {}, load_shedder.loop_lag)]),
+        ("threadpool_utilization", "gauge", "Fraction of threadpool workers busy",
+         [("threadpool_utilization", {}, load_shedder.threadpool_utilization)]),
+    ]
+
+class LoadSheddingMiddleware:
+    """ASGI middleware rejecting low-priority requests while the instance is overloaded"""
+    
+    def __init__(self, app, shedder: LoadShedder = load_shedder,
+                 rules: Optional[List[Tuple[int, Optional[str], str]]] = None):
+        self.app = app
+        self.shedder = shedder
+        self.rules: List[Tuple[int, Optional[str], Pattern]] = [
+            (priority, method, re.compile(path))
+            for priority, method, path in (rules if rules is not None else DEFAULT_RULES)
+        ]
+    
+    def priority(self, method: str, path: str) -> int:
+        for priority, rule_method, pattern in self.rules:
+            if (rule_method is None or rule_method == method) and pattern.match(path):
+                return priority
+        return NORMAL
+    
+    async def __call__(self, scope, receive, send):
+        # Healthy instances pay one attribute check per request
+        if scope["type"] != "http" or self.shedder.level == 0:
+            await self.app(scope, receive, send)
+            return
+        
+        priority = self.priority(scope["method"], scope["path"])
+        if self.shedder.admits(priority):
+            await self.app(scope, receive, send)
+            return
+        
+        requests_shed.labels(PRIORITY_NAMES[priority]).inc()
+        body = b'{"detail":"Server is overloaded, retry shortly"}'
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.load_shed_retry_after * self.shedder.level).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
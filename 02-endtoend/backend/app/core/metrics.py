@@ -0,0 +1,341 @@
+"""
+In-process metrics with Prometheus text exposition
+
+Counters and histograms keep one cell per thread, so the hot path is a
+plain list update with no lock; a scrape sums the cells. Values that
+already live elsewhere (pool sizes, cache counters) are read by collector
+callbacks at scrape time instead of being mirrored on every change.
+"""
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+Sample = Tuple[str, Dict[str, str], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class _Cells:
+    """Per-thread value arrays; only creating a thread's array takes the lock"""
+    
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+    
+    def mine(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self.size
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+    
+    def totals(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells)
+        totals = [0.0] * self.size
+        for cell in cells:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+class _Metric:
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values: str):
+        """The child metric for one combination of label values"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def _series(self) -> Iterable[Tuple[Dict[str, str], "_Metric"]]:
+        if not self.labelnames:
+            yield {}, self.labels()
+            return
+        for values, child in list(self._children.items()):
+            yield dict(zip(self.labelnames, values)), child
+    
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+class _CounterValue:
+    def __init__(self):
+        self._cells = _Cells(1)
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.mine()[0] += amount
+    
+    def get(self) -> float:
+        return self._cells.totals()[0]
+
+class Counter(_Metric):
+    """Monotonic count (name it with the _total suffix)"""
+    
+    kind = "counter"
+    
+    def _new_child(self):
+        return _CounterValue()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+    
+    def samples(self):
+        for labels, child in self._series():
+            yield self.name, labels, child.get()
+
+class Gauge(_Metric):
+    """Value that goes up and down (inc/dec deltas are summed across threads)"""
+    
+    kind = "gauge"
+    
+    def _new_child(self):
+        return _CounterValue()
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().inc(-amount)
+    
+    def samples(self):
+        for labels, child in self._series():
+            yield self.name, labels, child.get()
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # one count per bucket, then +Inf, then the running sum
+        self._cells = _Cells(len(buckets) + 2)
+    
+    def observe(self, value: float) -> None:
+        cell = self._cells.mine()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+    
+    def time(self):
+        return _Timer(self)
+    
+    def snapshot(self) -> Tuple[List[float], float]:
+        totals = self._cells.totals()
+        return totals[:-1], totals[-1]
+
+class _Timer:
+    def __init__(self, histogram: _HistogramValue):
+        self.histogram = histogram
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+    
+    def time(self):
+        return self.labels().time()
+    
+    def samples(self):
+        for labels, child in self._series():
+            counts, total = child.snapshot()
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield self.name + "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield self.name + "_count", labels, cumulative
+            yield self.name + "_sum", labels, total
+
+class Registry:
+    """Metrics and scrape-time collectors rendered together"""
+    
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def collector(self, fn):
+        """Register fn() -> [(name, kind, help, samples)], called on every scrape"""
+        self._collectors.append(fn)
+        return fn
+    
+    def render(self) -> str:
+        """Everything in Prometheus text exposition format 0.0.4"""
+        lines: List[str] = []
+        families = [(m.name, m.kind, m.documentation, m.samples()) for m in self._metrics]
+        for collect in self._collectors:
+            families.extend(collect())
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + pairs + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+registry = Registry()
+
+# HTTP
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"),
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled",
+)
+
+# Code execution
+code_executions_waiting = registry.gauge(
+    "code_executions_waiting", "Executions queued for a free execution slot",
+)
+code_executions_running = registry.gauge(
+    "code_executions_running", "Executions with a live child process",
+)
+code_execution_duration = registry.histogram(
+    "code_execution_duration_seconds", "Code execution wall time by language", ("language",),
+)
+code_execution_timeouts = registry.counter(
+    "code_execution_timeouts_total", "Executions killed at the time limit", ("language",),
+)
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight count per route
+
+    Routes are labelled by their template (/api/interviews/{interview_id}),
+    never the raw path, so label cardinality stays bounded.
+    """
+    
+    def __init__(self, app, exclude: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration.labels(method, template).observe(elapsed)
+            http_requests.labels(method, template, str(status)).inc()
+
+@registry.collector
+def _runtime_metrics():
+    """Database pool, hashing pool and cache counters, read at scrape time"""
+    from . import database
+    from .dependencies import get_participants_cache, get_user_cache
+    from . import security
+    
+    families = []
+    pool = database.engine.pool if database.engine is not None else None
+    if pool is not None and hasattr(pool, "checkedout"):
+        families += [
+            ("db_pool_size", "gauge", "Connections the pool keeps open", [("db_pool_size", {}, pool.size())]),
+            ("db_pool_checked_out", "gauge", "Connections currently checked out",
+             [("db_pool_checked_out", {}, pool.checkedout())]),
+            ("db_pool_overflow", "gauge", "Connections open beyond pool_size",
+             [("db_pool_overflow", {}, max(0, pool.overflow()))]),
+        ]
+    
+    hash_pool = security._hash_pool
+    if hash_pool is not None:
+        # Private attributes, but the only way to see a ProcessPoolExecutor's backlog
+        pending = len(getattr(hash_pool, "_pending_work_items", ()))
+        children = len(getattr(hash_pool, "_processes", None) or ())
+        families += [
+            ("password_hash_queue_depth", "gauge", "Hashing jobs submitted and not yet finished",
+             [("password_hash_queue_depth", {}, pending)]),
+            ("password_hash_workers", "gauge", "Live hashing worker processes",
+             [("password_hash_workers", {}, children)]),
+        ]
+    
+    caches = {
+        "token": security.get_token_cache(),
+        "user": get_user_cache(),
+        "participants": get_participants_cache(),
+    }
+    families += [
+        ("cache_hits_total", "counter", "Cache lookups served from memory",
+         [("cache_hits_total", {"cache": name}, cache.hits) for name, cache in caches.items()]),
+        ("cache_misses_total", "counter", "Cache lookups that fell through",
+         [("cache_misses_total", {"cache": name}, cache.misses) for name, cache in caches.items()]),
+    ]
+    return families
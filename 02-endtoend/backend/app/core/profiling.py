@@ -0,0 +1,157 @@
+"""
+Opt-in statistical profiler for single requests
+
+A request is profiled when it carries `X-Profile: <profiling_token>` or is
+picked at profiling_sample_rate. A sampler thread then records the stacks
+of every busy thread (the event loop and threadpool workers) until the
+response finishes, and the result is written to profiling_dir as a
+speedscope file (open it at https://www.speedscope.app). Samples from
+other requests running at the same time show up too, on their threads.
+
+The middleware is only installed when profiling_enabled is set, so it
+costs nothing otherwise.
+"""
+
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import anyio
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Leaf functions of threads that are parked rather than working
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+class Sampler:
+    """Samples the stacks of all other threads at a fixed interval"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.frames: List[dict] = []
+        self._frame_index: Dict[Tuple[str, str, int], int] = {}
+        self.samples: Dict[int, List[Tuple[float, List[int]]]] = {}
+        self.thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> float:
+        """Stop sampling; returns the profiled duration in seconds"""
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self.duration
+    
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            at = time.perf_counter() - self.started
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_id(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                if ident not in self.samples:
+                    self.samples[ident] = []
+                    self.thread_names.update((t.ident, t.name) for t in threading.enumerate())
+                self.samples[ident].append((at, stack))
+    
+    def _frame_id(self, code) -> int:
+        key = (code.co_filename, code.co_name, code.co_firstlineno)
+        index = self._frame_index.get(key)
+        if index is None:
+            index = self._frame_index[key] = len(self.frames)
+            self.frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return index
+    
+    def speedscope(self, name: str) -> dict:
+        """The samples as a speedscope file, one profile per thread"""
+        profiles = []
+        for ident, samples in self.samples.items():
+            profiles.append({
+                "type": "sampled",
+                "name": self.thread_names.get(ident, str(ident)),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": [stack for _, stack in samples],
+                "weights": [self.interval] * len(samples),
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "coding-interview-platform",
+            "shared": {"frames": self.frames},
+            "profiles": profiles,
+        }
+
+def _write_profile(directory: Path, filename: str, sampler: Sampler, name: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / filename
+    path.write_text(json.dumps(sampler.speedscope(name)))
+    return path
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling authorized or sampled requests"""
+    
+    def __init__(self, app, token: Optional[str] = None, sample_rate: Optional[float] = None,
+                 interval: Optional[float] = None, directory: Optional[str] = None):
+        self.app = app
+        self.token = (token if token is not None else settings.profiling_token or "").encode()
+        self.sample_rate = settings.profiling_sample_rate if sample_rate is None else sample_rate
+        self.interval = settings.profiling_interval if interval is None else interval
+        self.directory = Path(directory or settings.profiling_dir)
+    
+    def _wanted(self, scope) -> bool:
+        if self.token:
+            for name, value in scope.get("headers", []):
+                if name == b"x-profile":
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        sampler = Sampler(self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            duration = sampler.stop()
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            name = f"{scope['method']} {route} ({duration * 1000:.1f} ms)"
+            filename = "{}-{}-{}-{:.0f}ms.speedscope.json".format(
+                time.strftime("%Y%m%dT%H%M%S"),
+                scope["method"],
+                re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root",
+                duration * 1000,
+            )
+            # Encoding and writing the profile stays off the event loop
+            path = await anyio.to_thread.run_sync(_write_profile, self.directory, filename, sampler, name)
+            logger.info("Profiled %s -> %s", name, path)
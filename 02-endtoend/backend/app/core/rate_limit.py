@@ -0,0 +1,177 @@
+import math
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+from .config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """Parse "10/minute" into (capacity, period seconds)"""
+    count, _, period = rate.partition("/")
+    return int(count), PERIODS[period.strip().lower()]
+
+class RateLimitPolicy:
+    """Token bucket limits for the requests matching one route"""
+    
+    def __init__(self, name: str, method: str, path: str, rate: str, key: str = "ip"):
+        self.name = name
+        self.method = method
+        self.pattern: Pattern = re.compile(path)
+        self.capacity, self.period = parse_rate(rate)
+        self.refill_rate = self.capacity / self.period  # tokens per second
+        self.key = key  # "ip" or "user" (falls back to ip when anonymous)
+    
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.pattern.match(path) is not None
+
+class InMemoryBucketStore:
+    """Per-process token buckets"""
+    
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+    
+    async def take(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float, float]:
+        """Take one token; returns (allowed, tokens left, seconds until next token)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + (now - updated) * policy.refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > 100000:
+                self._evict(now, policy)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / policy.refill_rate
+        return allowed, tokens, wait
+    
+    def _evict(self, now: float, policy: RateLimitPolicy) -> None:
+        # Buckets idle for a full period are back at capacity and can be dropped
+        idle = [key for key, (_, updated) in self._buckets.items() if now - updated > policy.period]
+        for key in idle:
+            del self._buckets[key]
+
+class RedisBucketStore:
+    """Token buckets shared by all workers through Redis"""
+    
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+    
+    def __init__(self, url: str):
+        # asyncio client: a round trip must not hold up the event loop
+        import redis.asyncio
+        
+        self._client = redis.asyncio.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+    
+    async def take(self, key: str, policy: RateLimitPolicy) -> Tuple[bool, float, float]:
+        allowed, tokens = await self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[policy.capacity, policy.refill_rate, time.time()],
+        )
+        tokens = float(tokens)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / policy.refill_rate
+        return bool(allowed), tokens, wait
+
+def default_policies() -> List[RateLimitPolicy]:
+    """Policies for the most expensive endpoints (bcrypt and process spawns)"""
+    return [
+        RateLimitPolicy("login", "POST", r"^/api/auth/login/?$", settings.rate_limit_login),
+        RateLimitPolicy("register", "POST", r"^/api/auth/register/?$", settings.rate_limit_register),
+        RateLimitPolicy(
+            "execute", "POST", r"^/api/interviews/\d+/execute/?$",
+            settings.rate_limit_execute, key="user",
+        ),
+    ]
+
+class RateLimitMiddleware:
+    """ASGI middleware applying token bucket policies per route"""
+    
+    def __init__(self, app, policies: Optional[List[RateLimitPolicy]] = None, store=None):
+        self.app = app
+        self.policies = policies if policies is not None else default_policies()
+        if store is None:
+            if settings.rate_limit_backend == "redis":
+                store = RedisBucketStore(settings.redis_url)
+            else:
+                store = InMemoryBucketStore()
+        self.store = store
+        self._methods = {policy.method for policy in self.policies}
+    
+    def _client_key(self, scope, policy: RateLimitPolicy) -> str:
+        if policy.key == "user":
+            for name, value in scope.get("headers", []):
+                if name == b"authorization" and value[:7].lower() == b"bearer ":
+                    from jose import JWTError
+                    from .security import decode_access_token
+                    
+                    try:
+                        user_id = decode_access_token(value[7:].decode("latin-1")).get("sub")
+                    except JWTError:
+                        break
+                    if user_id is not None:
+                        return f"{policy.name}:user:{user_id}"
+                    break
+        client = scope.get("client")
+        return f"{policy.name}:ip:{client[0] if client else 'unknown'}"
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method, path = scope["method"], scope["path"]
+        policy = None
+        if method in self._methods:
+            policy = next((p for p in self.policies if p.matches(method, path)), None)
+        if policy is None:
+            # Unlimited routes pay for a set lookup and at most one regex per policy
+            await self.app(scope, receive, send)
+            return
+        
+        allowed, remaining, wait = await self.store.take(self._client_key(scope, policy), policy)
+        headers = [
+            (b"ratelimit-limit", str(policy.capacity).encode()),
+            (b"ratelimit-remaining", str(int(remaining)).encode()),
+            (b"ratelimit-reset", str(math.ceil(wait)).encode()),
+        ]
+        
+        if not allowed:
+            headers.append((b"retry-after", str(max(1, math.ceil(wait))).encode()))
+            body = b'{"detail":"Rate limit exceeded"}'
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
@@ -1,24 +1,154 @@
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import Optional, Tuple
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from .config import settings
+from .cache import TTLCache
+from .config import on_configure, rebuilt_on_configure, settings
+from .revocation import revocation_list
+
+@lru_cache(maxsize=None)
+def _pwd_context(rounds: int):
+    """bcrypt context for a cost factor, built on first use to keep passlib out of startup"""
+    from passlib.context import CryptContext
+    
+    # min/max rounds pinned to the cost so hashes made with another cost
+    # factor are flagged for update by verify_and_update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """Get the process pool used for bcrypt work (created on first use)"""
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ProcessPoolExecutor(
+                    max_workers=settings.password_hash_workers or os.cpu_count() or 1
+                )
+    return _hash_pool
+
+def _discard_hash_pool(pool: ProcessPoolExecutor, wait: bool) -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is pool:
+            _hash_pool = None
+    pool.shutdown(wait=wait)
+
+def shutdown_hash_pool() -> None:
+    """Shut down the hashing pool"""
+    pool = _hash_pool
+    if pool is not None:
+        _discard_hash_pool(pool, wait=True)
+
+@on_configure
+def _reset_hash_pool() -> None:
+    # The next call starts a pool sized by the new password_hash_workers
+    pool = _hash_pool
+    if pool is not None:
+        _discard_hash_pool(pool, wait=False)
+
+def _run_in_hash_pool(fn, *args):
+    pool = get_hash_pool()
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # A child died (e.g. OOM-killed) and the pool refuses all work from
+        # now on: replace it and retry once, since hashing is idempotent
+        _discard_hash_pool(pool, wait=False)
+        return get_hash_pool().submit(fn, *args).result()
+
+# The cost factor is passed to the children rather than read from their
+# settings, which configure() in this process does not reach
+def _hash_password(password: str, rounds: int) -> str:
+    return _pwd_context(rounds).hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _pwd_context(rounds).verify_and_update(plain_password, hashed_password)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify password in the hashing pool; returns a new hash if the cost factor changed"""
+    return _run_in_hash_pool(
+        _verify_and_update, plain_password, hashed_password, settings.bcrypt_rounds
+    )
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password in the hashing pool"""
+    return _run_in_hash_pool(_hash_password, password, settings.bcrypt_rounds)
+
+class ConcurrencyGuard:
+    """Caps in-flight operations per key (account, client IP)"""
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._in_flight = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def try_acquire(self, *keys: str) -> bool:
+        """Acquire a slot for every key, or none of them"""
+        with self._lock:
+            if any(self._in_flight[key] >= self.limit for key in keys):
+                return False
+            for key in keys:
+                self._in_flight[key] += 1
+            return True
+    
+    def release(self, *keys: str) -> None:
+        """Release slots acquired with try_acquire"""
+        with self._lock:
+            for key in keys:
+                self._in_flight[key] -= 1
+                if self._in_flight[key] <= 0:
+                    del self._in_flight[key]
+    
+    @contextmanager
+    def guard(self, *keys: str):
+        """Hold slots for the block or raise 429"""
+        if not self.try_acquire(*keys):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent login attempts",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            yield
+        finally:
+            self.release(*keys)
+
+@rebuilt_on_configure
+@lru_cache(maxsize=None)
+def get_login_guard() -> ConcurrencyGuard:
+    """Login concurrency guard, built on first use so configure() applies"""
+    return ConcurrencyGuard(settings.login_max_concurrent)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
+    from jose import jwt
+    
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -26,25 +156,47 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(
             minutes=settings.access_token_expire_minutes
         )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(
         to_encode, settings.secret_key, algorithm=settings.algorithm
     )
     return encoded_jwt
 
+@rebuilt_on_configure
+@lru_cache(maxsize=None)
+def get_token_cache() -> TTLCache:
+    """Verified token payloads, kept until the token's own expiry"""
+    return TTLCache(maxsize=settings.token_cache_size)
+
+def decode_access_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing earlier verifications of the same token"""
+    token_cache = get_token_cache()
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    from jose import jwt
+    
+    payload = jwt.decode(
+        token, settings.secret_key, algorithms=[settings.algorithm]
+    )
+    expires_at = payload.get("exp")
+    if expires_at is None or expires_at > time.time():
+        token_cache.set(token, payload, expires_at=expires_at)
+    return payload
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Get current user from token"""
+    from jose import JWTError
+    
     credential_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.secret_key, algorithms=[settings.algorithm]
-        )
+        payload = decode_access_token(token)
         user_id: str = payload.get("sub")
-        if user_id is None:
+        if user_id is None or revocation_list.is_revoked(payload.get("jti")):
             raise credential_exception
     except JWTError:
         raise credential_exception
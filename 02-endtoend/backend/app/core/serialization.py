@@ -0,0 +1,76 @@
+import enum
+import typing
+from typing import Any, Iterable, Iterator, List, Type
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+def _nested_model(annotation) -> Any:
+    """The BaseModel inside an annotation like Optional[Model], or None"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+class RowSerializer:
+    """Turns trusted ORM rows into plain dicts shaped like a response schema
+
+    Field names are resolved once from the schema, so serializing a row is a
+    getattr per field with no validation pass; orjson then encodes datetimes
+    and enums natively. Fields with a string validation_alias are read from
+    that attribute, as pydantic's from_attributes does.
+    """
+    
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self.fields = []
+        for name, field in schema.model_fields.items():
+            nested = _nested_model(field.annotation)
+            attribute = field.validation_alias if isinstance(field.validation_alias, str) else name
+            self.fields.append((name, attribute, RowSerializer(nested) if nested else None))
+    
+    def one(self, row) -> dict:
+        data = {}
+        for name, attribute, nested in self.fields:
+            value = getattr(row, attribute, None)
+            if nested is not None and value is not None:
+                value = nested.one(value)
+            elif isinstance(value, enum.Enum):
+                value = value.value
+            data[name] = value
+        return data
+    
+    def many(self, rows: Iterable) -> List[dict]:
+        one = self.one
+        return [one(row) for row in rows]
+    
+    def response(self, rows: Iterable) -> ORJSONResponse:
+        """Serialized list response that bypasses response_model revalidation"""
+        return ORJSONResponse(self.many(rows))
+    
+    def iter_json(self, rows: Iterable, batch_size: int = 100) -> Iterator[bytes]:
+        """Encode rows as one JSON array, batch_size rows per chunk"""
+        one = self.one
+        yield b"["
+        separator = b""
+        batch = []
+        for row in rows:
+            batch.append(one(row))
+            if len(batch) >= batch_size:
+                yield separator + orjson.dumps(batch, option=orjson.OPT_NON_STR_KEYS)[1:-1]
+                separator = b","
+                batch = []
+        if batch:
+            yield separator + orjson.dumps(batch, option=orjson.OPT_NON_STR_KEYS)[1:-1]
+        yield b"]"
+    
+    def stream(self, rows: Iterable, batch_size: int = 100) -> StreamingResponse:
+        """Streamed list response for large collections
+
+        Pass a cursor-backed iterable (e.g. query.yield_per(batch_size)) so
+        neither the ORM rows nor the encoded body are held in memory at once.
+        """
+        return StreamingResponse(self.iter_json(rows, batch_size), media_type="application/json")
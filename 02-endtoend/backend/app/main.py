@@ -0,0 +1,152 @@
+"""
+FastAPI application for the coding interview platform backend
+
+Run with `uvicorn app.main:create_app --factory` (or `app.main:app`, which
+builds the default app on first access). Heavy dependencies (routes, ORM
+models, jose, passlib) are imported inside create_app and the database
+engine is created in the lifespan startup, so importing this module is cheap.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI
+from app.core.config import Settings, configure, settings as app_settings
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the engine and tables and run background services for the app's lifetime"""
+    from app.core.database import Base, SessionLocal, get_engine
+    from app.core.load_shedding import load_shedder
+    from app.core.revocation import revocation_list
+    from app.core.security import shutdown_hash_pool
+    from app.services import judge_service, message_ingestion
+    from app.websocket import hub
+    
+    engine = get_engine()
+    Base.metadata.create_all(bind=engine)
+    message_ingestion.start()
+    revocation_list.start(SessionLocal)
+    await hub.start()
+    loop = asyncio.get_running_loop()
+    
+    def notify_room(interview_id: int, result: dict) -> None:
+        # Called from judge threads; the hub lives on the event loop
+        loop.call_soon_threadsafe(
+            hub.dispatch, interview_id, {"type": "submission-result", "result": result},
+        )
+    
+    judge_service.start(notify_room)
+    if app_settings.load_shed_enabled:
+        await load_shedder.start()
+    detector = None
+    if app_settings.blocking_detector_enabled:
+        from app.core.blocking import BlockingDetector
+        
+        detector = BlockingDetector()
+        detector.start()
+    yield
+    if detector is not None:
+        detector.stop()
+        if detector.offenders:
+            logger.warning("Event loop blocking call sites:\n%s", detector.format_report())
+    await load_shedder.stop()
+    # Judge workers may still notify the room, so stop them before the hub
+    await asyncio.to_thread(judge_service.stop)
+    await hub.stop()
+    revocation_list.stop()
+    # Drain buffered messages before the process exits
+    message_ingestion.stop()
+    shutdown_hash_pool()
+    engine.dispose()
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build the application"""
+    if settings is not None:
+        configure(settings)
+    settings = app_settings
+    
+    from fastapi import Response
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import ORJSONResponse, PlainTextResponse
+    from app.core.compression import CompressionMiddleware
+    from app.core.load_shedding import LoadSheddingMiddleware, load_shedder
+    from app.core.metrics import MetricsMiddleware, registry
+    from app.core.rate_limit import RateLimitMiddleware
+    from app.routes import auth_router, problems_router, interviews_router, collaboration_router
+    
+    app = FastAPI(
+        title=settings.app_name,
+        version=settings.app_version,
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
+    
+    if settings.rate_limit_enabled:
+        app.add_middleware(RateLimitMiddleware)
+    
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware)
+    
+    if settings.profiling_enabled:
+        from app.core.profiling import ProfilingMiddleware
+        
+        app.add_middleware(ProfilingMiddleware)
+    
+    if settings.load_shed_enabled:
+        app.add_middleware(LoadSheddingMiddleware)
+    
+    # Wraps the middleware above, so their 429 and 503 responses carry CORS headers
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    if settings.metrics_enabled:
+        # Outermost, so latency includes the other middleware
+        app.add_middleware(MetricsMiddleware)
+        
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            """Prometheus scrape endpoint"""
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+    
+    app.include_router(auth_router, prefix="/api")
+    app.include_router(problems_router, prefix="/api")
+    app.include_router(interviews_router, prefix="/api")
+    app.include_router(collaboration_router)
+    
+    @app.get("/health")
+    async def health_check():
+        """Liveness: the process is up and serving, even while it sheds load"""
+        return {"status": "healthy", "service": "coding-interview-platform"}
+    
+    @app.get("/health/ready")
+    async def readiness_check(response: Response):
+        """Readiness: 503 while shedding load so balancers route new traffic elsewhere"""
+        if not load_shedder.ready:
+            response.status_code = 503
+        return {
+            "status": "ready" if load_shedder.ready else "overloaded",
+            "ready": load_shedder.ready,
+            "load": load_shedder.snapshot(),
+        }
+    
+    return app
+
+_app: Optional[FastAPI] = None
+
+def __getattr__(name: str):
+    # `app.main:app` keeps working, but the app is only built when asked for
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,4 @@
-from .models import User, Problem, Interview, Solution, Message, UserRole, InterviewStatus
+from .models import User, Problem, Interview, Solution, Message, CodeSnapshot, ProblemStats, RevokedToken, UserRole, InterviewStatus
 
 __all__ = [
     "User",
@@ -6,6 +6,9 @@ __all__ = [
     "Interview",
     "Solution",
     "Message",
+    "CodeSnapshot",
+    "ProblemStats",
+    "RevokedToken",
     "UserRole",
     "InterviewStatus",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum, JSON, LargeBinary, Index, Float
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -46,12 +46,21 @@ class Problem(Base):
     tags = Column(JSON, default=list)  # ["array", "sorting", etc.]
     sample_input = Column(Text)
     sample_output = Column(Text)
-    test_cases = Column(JSON)  # [{input, output, hidden}, ...]
+    test_cases = Column(JSON)  # [{input_ref, output_ref, hidden}, ...] (blob store hashes)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     interviews = relationship("Interview", back_populates="problem")
     solutions = relationship("Solution", back_populates="problem")
+    stats = relationship("ProblemStats", uselist=False, lazy="joined", back_populates="problem")
+    
+    @property
+    def public_test_cases(self):
+        """Test cases as shown to API clients: hidden ones without their blob refs"""
+        return [
+            {"hidden": True} if test_case.get("hidden") else test_case
+            for test_case in self.test_cases or []
+        ]
 
 class Interview(Base):
     __tablename__ = "interviews"
@@ -85,6 +94,8 @@ class Solution(Base):
     language = Column(String)  # python, java, cpp, javascript, etc.
     status = Column(String)  # accepted, wrong_answer, runtime_error, timeout
     test_results = Column(JSON)  # [{test_case, passed, output, expected}, ...]
+    execution_time = Column(Float, nullable=True)  # seconds, total over test cases
+    claimed_at = Column(DateTime, nullable=True)  # when a judge worker took it
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -101,3 +112,48 @@ class Message(Base):
     content = Column(Text)
     message_type = Column(String)  # chat, code_update, system
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CodeSnapshot(Base):
+    __tablename__ = "code_snapshots"
+    __table_args__ = (
+        Index("ix_code_snapshots_stream", "interview_id", "user_id", "seq", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    interview_id = Column(Integer, ForeignKey("interviews.id"))
+    user_id = Column(Integer, ForeignKey("users.id"))
+    seq = Column(Integer)  # position in the (interview, user) stream
+    is_keyframe = Column(Boolean, default=False)
+    payload = Column(LargeBinary)  # zlib: full code for keyframes, edit ops for deltas
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ProblemStats(Base):
+    __tablename__ = "problem_stats"
+    
+    problem_id = Column(Integer, ForeignKey("problems.id"), primary_key=True)
+    submissions = Column(Integer, default=0)
+    accepted = Column(Integer, default=0)
+    language_counts = Column(JSON, default=dict)  # {"python": 12, ...}
+    runtime_histogram = Column(JSON, default=dict)  # {bucket_ms: count} of accepted runs
+    median_runtime = Column(Float, nullable=True)  # seconds
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    problem = relationship("Problem", back_populates="stats")
+    
+    @property
+    def acceptance_rate(self) -> float:
+        if not self.submissions:
+            return 0.0
+        return round(100.0 * self.accepted / self.submissions, 1)
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    # Autoincrement id: workers sync revocations with an id cursor
+    id = Column(Integer, primary_key=True)
+    jti = Column(String, unique=True, nullable=False)
+    expires_at = Column(DateTime, index=True)  # row can be purged after this
+    revoked_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,9 +1,11 @@
 from .auth import router as auth_router
 from .problems import router as problems_router
 from .interviews import router as interviews_router
+from .collaboration import router as collaboration_router
 
 __all__ = [
     "auth_router",
     "problems_router",
     "interviews_router",
+    "collaboration_router",
 ]
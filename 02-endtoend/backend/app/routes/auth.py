@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta
 from app.core.database import get_db
-from app.core.security import get_current_user, create_access_token
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    get_current_user,
+    get_login_guard,
+    oauth2_scheme,
+)
+from app.core.revocation import revocation_list
+from app.core.dependencies import get_current_active_user
 from app.schemas import UserCreate, UserLogin, UserResponse, Token
 from app.services import UserService
+from app.models import User
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -22,9 +31,11 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+def login(user: UserLogin, request: Request, db: Session = Depends(get_db)):
     """Login user and return JWT token"""
-    db_user = UserService.authenticate_user(db, user.email, user.password)
+    client_ip = request.client.host if request.client else "unknown"
+    with get_login_guard().guard(f"account:{user.email.lower()}", f"ip:{client_ip}"):
+        db_user = UserService.authenticate_user(db, user.email, user.password)
     
     if not db_user:
         raise HTTPException(
@@ -44,13 +55,19 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
     }
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
+def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+    """Get current user information"""
+    return current_user
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token: str = Depends(oauth2_scheme),
     current_user_id: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get current user information"""
-    user = db.query(UserService.__module__.split('.')[-1]).filter(
-        db.query(UserService.__module__).first()
-    )
-    # Simplified: just return user ID (would need proper query)
-    return {"id": int(current_user_id)}
+    """Revoke the current access token"""
+    payload = decode_access_token(token)
+    if payload.get("jti"):
+        revocation_list.revoke(
+            db, payload["jti"], datetime.utcfromtimestamp(payload["exp"])
+        )
@@ -0,0 +1,87 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
+from app.core.database import SessionLocal
+from app.core.dependencies import get_interview_participants
+from app.core.security import get_current_user
+from app.websocket import Connection, hub
+
+router = APIRouter(tags=["collaboration"])
+
+def _load_participants(interview_id: int):
+    db = SessionLocal()
+    try:
+        return get_interview_participants(db, interview_id)
+    finally:
+        db.close()
+
+def _to_command(event: str, data: dict) -> Optional[dict]:
+    """Translate a client event into a room command"""
+    if event == "code-delta":
+        return {"type": "code-delta", "version": int(data.get("version", -1)), "ops": data.get("ops")}
+    if event == "code-update":
+        return {"type": "code-update", "code": data.get("code", "")}
+    if event == "chat-message":
+        return {"type": "chat-message", "message": data.get("message", "")}
+    if event == "test-result":
+        return {"type": "test-result", "result": data.get("result")}
+    if event == "cursor-move":
+        return {"type": "cursor-move", "state": {
+            "line": data.get("line"),
+            "column": data.get("column"),
+            "selection": data.get("selection"),
+        }}
+    return None
+
+@router.websocket("/ws/interviews/{interview_id}")
+async def interview_socket(
+    websocket: WebSocket,
+    interview_id: int,
+    token: str = "",
+    last_seq: Optional[int] = None,
+):
+    """Real-time collaboration for an interview room (token passed as query param)
+
+    Reconnecting clients pass the last seq they saw and receive the missed
+    events in one room-resume frame, or a room-snapshot if too far behind.
+    """
+    try:
+        user_id = int(await get_current_user(token))
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    participants = await run_in_threadpool(_load_participants, interview_id)
+    if participants is None or user_id not in participants:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    connection = Connection(websocket, user_id)
+    room = await hub.join(interview_id, connection)
+    connection.offer(room.resume(last_seq))
+    hub.dispatch(interview_id, {"type": "join", "userId": user_id, "connection": connection.id})
+    
+    try:
+        while True:
+            message = await websocket.receive_json()
+            event = message.get("event")
+            if event == "code-resync":
+                room.send_state(connection.id)
+                continue
+            if event == "leave-interview":
+                break
+            try:
+                command = _to_command(event, message.get("data") or {})
+            except (TypeError, ValueError):
+                room.send_state(connection.id)
+                continue
+            if command is not None:
+                command["userId"] = user_id
+                command["connection"] = connection.id
+                hub.dispatch(interview_id, command)
+    except (WebSocketDisconnect, ValueError):
+        pass
+    finally:
+        await hub.leave(interview_id, connection)
+        hub.dispatch(interview_id, {"type": "leave", "userId": user_id})
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from datetime import datetime
+import json
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import get_current_user
+from app.core.dependencies import invalidate_interview, require_interview_access
 from app.schemas import (
     InterviewCreate,
     InterviewUpdate,
@@ -12,9 +16,23 @@ from app.schemas import (
     CodeExecutionResult,
     SolutionCreate,
     SolutionResponse,
+    MessageCreate,
+    MessageResponse,
+    CodeSnapshotCreate,
+    CodeSnapshotResponse,
+    interview_list_serializer,
+    solution_list_serializer,
 )
-from app.services import InterviewService, SolutionService, CodeExecutionService
-from app.models import Interview, Solution, InterviewStatus
+from app.services import (
+    InterviewService,
+    SolutionService,
+    CodeExecutionService,
+    MessageService,
+    SnapshotService,
+    judge_service,
+    message_ingestion,
+)
+from app.models import Interview, Solution, InterviewStatus, User
 
 router = APIRouter(prefix="/interviews", tags=["interviews"])
 
@@ -69,70 +87,150 @@ def update_interview(
     
     db.add(db_interview)
     db.commit()
+    invalidate_interview(interview_id)
     db.refresh(db_interview)
     return db_interview
 
 @router.get("/user/{user_id}", response_model=List[InterviewResponse])
 def get_user_interviews(user_id: int, db: Session = Depends(get_db)):
     """Get all interviews for a user"""
+    batch_size = settings.stream_batch_size
     interviews = db.query(Interview).filter(
         (Interview.interviewer_id == user_id) | (Interview.candidate_id == user_id)
-    ).all()
-    return interviews
+    ).yield_per(batch_size)
+    return interview_list_serializer.stream(interviews, batch_size)
 
 @router.post("/{interview_id}/execute", response_model=CodeExecutionResult)
 def execute_code(
     interview_id: int,
     request: CodeExecutionRequest,
-    current_user_id: str = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(require_interview_access)
 ):
     """Execute code during interview"""
-    # Verify interview exists and user has access
-    db_interview = db.query(Interview).filter(Interview.id == interview_id).first()
-    if not db_interview:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Interview not found"
-        )
-    
-    current_id = int(current_user_id)
-    if db_interview.interviewer_id != current_id and db_interview.candidate_id != current_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this interview"
-        )
-    
     result = CodeExecutionService.execute_code(request)
     return result
 
-@router.post("/{interview_id}/solutions", response_model=SolutionResponse)
+@router.post(
+    "/{interview_id}/solutions",
+    response_model=SolutionResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def submit_solution(
     interview_id: int,
     solution: SolutionCreate,
-    current_user_id: str = Depends(get_current_user),
+    current_user: User = Depends(require_interview_access),
     db: Session = Depends(get_db)
 ):
-    """Submit a solution during interview"""
-    db_interview = db.query(Interview).filter(Interview.id == interview_id).first()
-    if not db_interview:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Interview not found"
-        )
-    
+    """Submit a solution during interview
+
+    The solution is stored as queued and judged in the background; the
+    verdict is pushed to the interview room as submission-judged and can be
+    polled from GET /{interview_id}/solutions/{solution_id}.
+    """
     solution_data = solution.dict()
     solution_data["interview_id"] = interview_id
-    solution_data["user_id"] = int(current_user_id)
+    solution_data["user_id"] = current_user.id
+    solution_data["status"] = "queued"
     
     db_solution = SolutionService.create_solution(db, solution_data)
+    judge_service.submit(db_solution.id)
     return db_solution
 
 @router.get("/{interview_id}/solutions", response_model=List[SolutionResponse])
 def get_interview_solutions(
     interview_id: int,
+    current_user: User = Depends(require_interview_access),
     db: Session = Depends(get_db)
 ):
     """Get all solutions for an interview"""
-    solutions = db.query(Solution).filter(Solution.interview_id == interview_id).all()
-    return solutions
+    batch_size = settings.stream_batch_size
+    solutions = db.query(Solution).filter(
+        Solution.interview_id == interview_id
+    ).yield_per(batch_size)
+    return solution_list_serializer.stream(solutions, batch_size)
+
+@router.get("/{interview_id}/solutions/{solution_id}", response_model=SolutionResponse)
+def get_solution(
+    interview_id: int,
+    solution_id: int,
+    current_user: User = Depends(require_interview_access),
+    db: Session = Depends(get_db)
+):
+    """Get one solution, including its judging status and test results"""
+    solution = SolutionService.get_solution(db, solution_id)
+    if not solution or solution.interview_id != interview_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Solution not found"
+        )
+    return solution
+
+@router.post("/{interview_id}/messages", status_code=status.HTTP_202_ACCEPTED)
+def post_message(
+    interview_id: int,
+    message: MessageCreate,
+    current_user: User = Depends(require_interview_access)
+):
+    """Queue a chat/code_update message for the interview transcript"""
+    message_ingestion.enqueue(
+        interview_id, current_user.id, message.content, message.message_type
+    )
+    return {"queued": True}
+
+@router.get("/{interview_id}/messages", response_model=List[MessageResponse])
+def get_interview_messages(
+    interview_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_interview_access),
+    db: Session = Depends(get_db)
+):
+    """Get the interview transcript (messages appear once the buffer is flushed)"""
+    return MessageService.get_interview_messages(db, interview_id, skip, limit)
+
+@router.post("/{interview_id}/snapshots", response_model=Optional[CodeSnapshotResponse])
+def record_snapshot(
+    interview_id: int,
+    snapshot: CodeSnapshotCreate,
+    current_user: User = Depends(require_interview_access),
+    db: Session = Depends(get_db)
+):
+    """Record the current editor contents (returns null if nothing changed)"""
+    return SnapshotService.record_snapshot(
+        db, interview_id, current_user.id, snapshot.code
+    )
+
+@router.get("/{interview_id}/snapshots/{user_id}/code")
+def get_code_at(
+    interview_id: int,
+    user_id: int,
+    at: Optional[datetime] = None,
+    current_user: User = Depends(require_interview_access),
+    db: Session = Depends(get_db)
+):
+    """Rebuild a user's code as of a timestamp (latest if omitted)"""
+    code = SnapshotService.get_code_at(db, interview_id, user_id, at=at)
+    if code is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No snapshot found"
+        )
+    return {"interview_id": interview_id, "user_id": user_id, "at": at, "code": code}
+
+@router.get("/{interview_id}/snapshots/{user_id}/replay")
+def replay_snapshots(
+    interview_id: int,
+    user_id: int,
+    current_user: User = Depends(require_interview_access),
+    db: Session = Depends(get_db)
+):
+    """Stream the code history as newline-delimited JSON"""
+    def generate():
+        for snapshot, code in SnapshotService.iter_replay(db, interview_id, user_id):
+            yield json.dumps({
+                "seq": snapshot.seq,
+                "created_at": snapshot.created_at.isoformat(),
+                "code": code,
+            }) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
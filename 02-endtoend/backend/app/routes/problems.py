@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import get_current_user
-from app.schemas import ProblemCreate, ProblemResponse
-from app.services import ProblemService
+from app.schemas import ProblemCreate, ProblemResponse, problem_list_serializer
+from app.services import ProblemService, blob_store
 from app.models import Problem
 
 router = APIRouter(prefix="/problems", tags=["problems"])
@@ -30,6 +32,27 @@ def get_problem(problem_id: int, db: Session = Depends(get_db)):
         )
     return db_problem
 
+@router.get("/{problem_id}/test-cases/{index}/{part}")
+def get_test_case_payload(
+    problem_id: int,
+    index: int,
+    part: Literal["input", "output"],
+    db: Session = Depends(get_db)
+):
+    """Download the input or expected output of a visible test case"""
+    db_problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    test_cases = (db_problem.test_cases or []) if db_problem else []
+    test_case = test_cases[index] if 0 <= index < len(test_cases) else None
+    if not test_case or test_case.get("hidden") or not test_case.get(f"{part}_ref"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test case not found"
+        )
+    return FileResponse(
+        blob_store.path_for(test_case[f"{part}_ref"]),
+        media_type="text/plain; charset=utf-8",
+    )
+
 @router.get("/", response_model=List[ProblemResponse])
 def get_problems(
     skip: int = 0,
@@ -41,4 +64,6 @@ def get_problems(
     query = db.query(Problem)
     if difficulty:
         query = query.filter(Problem.difficulty == difficulty)
-    return query.offset(skip).limit(limit).all()
+    batch_size = settings.stream_batch_size
+    rows = query.offset(skip).limit(limit).yield_per(batch_size)
+    return problem_list_serializer.stream(rows, batch_size)
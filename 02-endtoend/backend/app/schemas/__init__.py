@@ -7,6 +7,7 @@ from .schemas import (
     ProblemBase,
     ProblemCreate,
     ProblemResponse,
+    ProblemStatsResponse,
     InterviewBase,
     InterviewCreate,
     InterviewUpdate,
@@ -17,7 +18,13 @@ from .schemas import (
     SolutionCreate,
     SolutionResponse,
     MessageBase,
+    MessageCreate,
     MessageResponse,
+    CodeSnapshotCreate,
+    CodeSnapshotResponse,
+    problem_list_serializer,
+    interview_list_serializer,
+    solution_list_serializer,
 )
 
 __all__ = [
@@ -29,6 +36,7 @@ __all__ = [
     "ProblemBase",
     "ProblemCreate",
     "ProblemResponse",
+    "ProblemStatsResponse",
     "InterviewBase",
     "InterviewCreate",
     "InterviewUpdate",
@@ -39,5 +47,11 @@ __all__ = [
     "SolutionCreate",
     "SolutionResponse",
     "MessageBase",
+    "MessageCreate",
     "MessageResponse",
+    "CodeSnapshotCreate",
+    "CodeSnapshotResponse",
+    "problem_list_serializer",
+    "interview_list_serializer",
+    "solution_list_serializer",
 ]
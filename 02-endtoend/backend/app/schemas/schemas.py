@@ -1,7 +1,8 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from app.models import UserRole, InterviewStatus
+from app.core.serialization import RowSerializer
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -42,12 +43,23 @@ class ProblemBase(BaseModel):
     sample_output: str
 
 class ProblemCreate(ProblemBase):
-    test_cases: List[dict]
+    test_cases: List[dict]  # [{input, output, hidden}, ...], payloads are moved to the blob store
+
+class ProblemStatsResponse(BaseModel):
+    submissions: int
+    accepted: int
+    acceptance_rate: float
+    language_counts: dict
+    median_runtime: Optional[float]
+    
+    class Config:
+        from_attributes = True
 
 class ProblemResponse(ProblemBase):
     id: int
-    test_cases: List[dict]
+    test_cases: List[dict] = Field(validation_alias="public_test_cases")
     created_at: datetime
+    stats: Optional[ProblemStatsResponse] = None
     
     class Config:
         from_attributes = True
@@ -68,7 +80,7 @@ class InterviewUpdate(BaseModel):
 class InterviewResponse(BaseModel):
     id: int
     interviewer_id: int
-    candidate_id: int
+    candidate_id: Optional[int]  # InterviewCreate lets the candidate be invited later
     problem_id: int
     status: InterviewStatus
     scheduled_at: datetime
@@ -105,7 +117,9 @@ class SolutionResponse(BaseModel):
     problem_id: int
     code: str
     language: str
-    status: Optional[str]
+    status: Optional[str]  # queued until judged, then accepted, wrong_answer, runtime_error or timeout
+    test_results: Optional[List[dict]] = None
+    execution_time: Optional[float] = None
     created_at: datetime
     
     class Config:
@@ -113,7 +127,11 @@ class SolutionResponse(BaseModel):
 
 class MessageBase(BaseModel):
     content: str
-    message_type: str = "chat"
+    message_type: Literal["chat", "code_update", "system"] = "chat"
+
+class MessageCreate(MessageBase):
+    # system messages are written by the server only
+    message_type: Literal["chat", "code_update"] = "chat"
 
 class MessageResponse(MessageBase):
     id: int
@@ -123,3 +141,24 @@ class MessageResponse(MessageBase):
     
     class Config:
         from_attributes = True
+
+
+class CodeSnapshotCreate(BaseModel):
+    code: str
+
+class CodeSnapshotResponse(BaseModel):
+    id: int
+    interview_id: int
+    user_id: int
+    seq: int
+    is_keyframe: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+# Pre-built serializers for list endpoints
+
+problem_list_serializer = RowSerializer(ProblemResponse)
+interview_list_serializer = RowSerializer(InterviewResponse)
+solution_list_serializer = RowSerializer(SolutionResponse)
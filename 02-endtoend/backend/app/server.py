@@ -0,0 +1,132 @@
+"""
+Production launcher
+
+    python -m app.server
+
+Runs gunicorn with uvicorn workers, configured from Settings: one worker per
+core by default (one in all when rooms use the in-process pub/sub, which
+workers cannot share), the app preloaded in the master so workers share its memory
+copy-on-write, max-requests recycling with jitter, and graceful drain on
+SIGTERM. Falls back to uvicorn's own process manager where gunicorn is not
+available (e.g. Windows); that manager does not replace exited workers, so
+the fallback runs without max-requests recycling.
+"""
+
+import logging
+import os
+from typing import Callable, List
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_worker_startup_hooks: List[Callable[[], None]] = []
+
+def on_worker_start(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a hook that runs in each worker right after it is forked"""
+    _worker_startup_hooks.append(hook)
+    return hook
+
+@on_worker_start
+def _reset_database_pool() -> None:
+    # Connections must never be shared across processes
+    from app.core import database
+    
+    if database.engine is not None:
+        database.engine.dispose(close=False)
+        # The lifespan startup creates this worker's own engine
+        database.engine = None
+
+@on_worker_start
+def _reset_hash_pool() -> None:
+    # A pool inherited from the master would point at the master's processes
+    from app.core import security
+    
+    security._hash_pool = None
+
+def run_worker_startup_hooks() -> None:
+    for hook in _worker_startup_hooks:
+        hook()
+
+def worker_count() -> int:
+    if settings.server_workers:
+        return settings.server_workers
+    if settings.pubsub_backend == "memory":
+        return 1
+    # CPUs this process may run on, which containers often limit below the host count
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def run_gunicorn() -> None:
+    from gunicorn.app.base import BaseApplication
+    from app.main import create_app
+    
+    class Server(BaseApplication):
+        def __init__(self, application):
+            self.application = application
+            super().__init__()
+        
+        def load_config(self):
+            options = {
+                "bind": f"{settings.server_host}:{settings.server_port}",
+                "workers": worker_count(),
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": True,
+                "max_requests": settings.server_max_requests,
+                "max_requests_jitter": settings.server_max_requests_jitter,
+                "graceful_timeout": settings.server_graceful_timeout,
+                "post_fork": lambda server, worker: run_worker_startup_hooks(),
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return self.application
+    
+    # Built once in the master; workers inherit it copy-on-write
+    Server(create_app()).run()
+
+def run_uvicorn() -> None:
+    import uvicorn
+    
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=worker_count(),
+        # No limit_max_requests: a worker that exits on it would not be respawned
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+    )
+
+def check_workers(workers: int) -> None:
+    """Refuse several workers when their rooms could not see each other"""
+    if workers <= 1:
+        return
+    if settings.pubsub_backend == "memory":
+        # Participants of one interview land on different workers and would
+        # never see each other's edits, chat or verdicts
+        raise SystemExit(
+            f"server_workers={workers} needs a shared pub/sub backend: "
+            "set PUBSUB_BACKEND=redis, or SERVER_WORKERS=1"
+        )
+    if settings.rate_limit_enabled and settings.rate_limit_backend == "memory":
+        logger.warning(
+            "Rate limit buckets are per worker with rate_limit_backend=memory, "
+            "so clients get up to %d times the configured limits", workers,
+        )
+
+def main() -> None:
+    check_workers(worker_count())
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        logger.warning(
+            "gunicorn is not installed; using uvicorn workers without preload or max-requests recycling"
+        )
+        run_uvicorn()
+        return
+    run_gunicorn()
+
+if __name__ == "__main__":
+    main()
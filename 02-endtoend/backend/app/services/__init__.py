@@ -1,10 +1,24 @@
+from .blob_store import BlobStore, blob_store
 from .code_executor import CodeExecutionService
-from .services import UserService, ProblemService, InterviewService, SolutionService
+from .judge import JudgeService, judge_service
+from .message_ingestion import MessageIngestionService, message_ingestion
+from .problem_stats import ProblemStatsService
+from .snapshots import SnapshotService
+from .services import UserService, ProblemService, InterviewService, SolutionService, MessageService
 
 __all__ = [
+    "BlobStore",
+    "blob_store",
     "CodeExecutionService",
+    "JudgeService",
+    "judge_service",
+    "MessageIngestionService",
+    "message_ingestion",
     "UserService",
     "ProblemService",
     "InterviewService",
     "SolutionService",
+    "MessageService",
+    "SnapshotService",
+    "ProblemStatsService",
 ]
@@ -1,11 +1,26 @@
 import subprocess
 import tempfile
+import threading
 import os
-from typing import Dict, Tuple
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 from app.schemas import CodeExecutionRequest, CodeExecutionResult
-from app.core.config import settings
+from app.core.config import rebuilt_on_configure, settings
+from app.core.metrics import (
+    code_execution_duration,
+    code_execution_timeouts,
+    code_executions_running,
+    code_executions_waiting,
+)
+from app.services.blob_store import blob_store
 import time
 
+@rebuilt_on_configure
+@lru_cache(maxsize=None)
+def _execution_slots() -> threading.BoundedSemaphore:
+    """Children running at once; further executions queue here"""
+    return threading.BoundedSemaphore(settings.execution_concurrency or os.cpu_count() or 1)
+
 class CodeExecutionService:
     """Service for executing code in sandboxed environment"""
     
@@ -13,33 +28,32 @@ class CodeExecutionService:
         "python": {
             "extension": ".py",
             "command": "python",
-            "timeout": settings.max_execution_time,
         },
         "javascript": {
             "extension": ".js",
             "command": "node",
-            "timeout": settings.max_execution_time,
         },
         "java": {
             "extension": ".java",
             "command": "java",
-            "timeout": settings.max_execution_time,
         },
         "cpp": {
             "extension": ".cpp",
             "command": "g++",
-            "timeout": settings.max_execution_time,
         },
         "c": {
             "extension": ".c",
             "command": "gcc",
-            "timeout": settings.max_execution_time,
         },
     }
     
     @staticmethod
-    def execute_code(request: CodeExecutionRequest) -> CodeExecutionResult:
-        """Execute code and return result"""
+    def execute_code(request: CodeExecutionRequest, input_ref: Optional[str] = None) -> CodeExecutionResult:
+        """Execute code and return result
+
+        input_ref (internal callers only, e.g. the judge) feeds a blob store
+        payload to stdin instead of request.input_data.
+        """
         language = request.language.lower()
         
         if language not in CodeExecutionService.LANGUAGE_CONFIG:
@@ -50,8 +64,23 @@ class CodeExecutionService:
                 execution_time=0
             )
         
+        code_executions_waiting.inc()
+        with _execution_slots():
+            code_executions_waiting.dec()
+            code_executions_running.inc()
+            started = time.perf_counter()
+            try:
+                return CodeExecutionService._run(request, language, input_ref)
+            finally:
+                code_executions_running.dec()
+                code_execution_duration.labels(language).observe(time.perf_counter() - started)
+    
+    @staticmethod
+    def _run(request: CodeExecutionRequest, language: str, input_ref: Optional[str]) -> CodeExecutionResult:
         try:
             config = CodeExecutionService.LANGUAGE_CONFIG[language]
+            # Read per run so configure() applies
+            timeout = settings.max_execution_time
             
             # Create temporary file
             with tempfile.NamedTemporaryFile(
@@ -76,7 +105,7 @@ class CodeExecutionService:
                     subprocess.run(
                         [config['command'], temp_file, '-o', output_file],
                         capture_output=True,
-                        timeout=config['timeout'],
+                        timeout=timeout,
                         text=True
                     )
                     cmd = [output_file]
@@ -85,21 +114,28 @@ class CodeExecutionService:
                     subprocess.run(
                         [config['command'], temp_file, '-o', output_file],
                         capture_output=True,
-                        timeout=config['timeout'],
+                        timeout=timeout,
                         text=True
                     )
                     cmd = [output_file]
                 else:
                     cmd = [config['command'], temp_file]
                 
-                # Execute
-                result = subprocess.run(
-                    cmd,
-                    input=request.input_data,
-                    capture_output=True,
-                    timeout=config['timeout'],
-                    text=True
-                )
+                # Execute (blob inputs are handed to the child as a file
+                # descriptor so the payload never passes through Python)
+                stdin_file = blob_store.open(input_ref) if input_ref else None
+                try:
+                    result = subprocess.run(
+                        cmd,
+                        input=None if stdin_file else request.input_data,
+                        stdin=stdin_file,
+                        capture_output=True,
+                        timeout=timeout,
+                        text=True
+                    )
+                finally:
+                    if stdin_file:
+                        stdin_file.close()
                 
                 execution_time = time.time() - start_time
                 
@@ -117,12 +153,13 @@ class CodeExecutionService:
                     error=result.stderr if result.stderr else None,
                     execution_time=execution_time
                 )
-                
+            
             finally:
                 # Clean up
                 os.unlink(temp_file)
-                
+        
         except subprocess.TimeoutExpired:
+            code_execution_timeouts.labels(language).inc()
             return CodeExecutionResult(
                 success=False,
                 error=f"Code execution timed out (limit: {settings.max_execution_time}s)",
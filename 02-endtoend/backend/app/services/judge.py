@@ -0,0 +1,231 @@
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import registry
+from app.models import Problem, Solution
+from app.schemas import CodeExecutionRequest
+from .blob_store import blob_store
+from .code_executor import CodeExecutionService
+from .problem_stats import ProblemStatsService
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+
+class JudgeService:
+    """Judges queued submissions against their problem's test cases in background threads
+
+    The API stores a solution as queued and hands its id to submit(). A
+    worker claims it (queued -> running, so a submission is judged once even
+    with several processes), runs the test cases through
+    CodeExecutionService and stores the verdict, per-test results and total
+    runtime in one commit, together with the problem statistics. notify is
+    then called with the result so it can be pushed to the interview room.
+
+    A claim records claimed_at; a solution still running judge_claim_timeout
+    later is presumed to belong to a worker that died, and can be claimed
+    again. The verdict is written only if the claim is unchanged, so a slow
+    worker that lost its claim neither overwrites nor double counts it.
+    """
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self._workers = workers
+        self.session_factory = session_factory
+        self.notify: Optional[Callable[[int, dict], None]] = None
+        self._queue: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+    
+    @property
+    def workers(self) -> int:
+        # Read when the workers start, so configure() applies to the shared instance
+        return self._workers or settings.judge_workers
+    
+    @property
+    def pending(self) -> int:
+        """Submissions waiting for a worker"""
+        return self._queue.qsize()
+    
+    def submit(self, solution_id: int) -> None:
+        """Queue a committed solution for judging"""
+        self._queue.put(solution_id)
+    
+    @staticmethod
+    def _claimable(now: datetime):
+        """Queued, or running with a claim older than judge_claim_timeout"""
+        stale = now - timedelta(seconds=settings.judge_claim_timeout)
+        return or_(
+            Solution.status == QUEUED,
+            and_(
+                Solution.status == RUNNING,
+                or_(Solution.claimed_at.is_(None), Solution.claimed_at < stale),
+            ),
+        )
+    
+    def requeue_queued(self) -> int:
+        """Queue solutions left unjudged by a previous run, or by a worker that died"""
+        db = self.session_factory()
+        try:
+            ids = [row.id for row in db.query(Solution.id).filter(self._claimable(datetime.utcnow()))]
+        finally:
+            db.close()
+        for solution_id in ids:
+            self.submit(solution_id)
+        return len(ids)
+    
+    def _claim(self, db: Session, solution_id: int) -> Optional[datetime]:
+        """Take a solution for this worker; returns the claim's timestamp"""
+        now = datetime.utcnow()
+        claimed = db.query(Solution).filter(
+            Solution.id == solution_id, self._claimable(now)
+        ).update({Solution.status: RUNNING, Solution.claimed_at: now}, synchronize_session=False)
+        db.commit()
+        return now if claimed == 1 else None
+    
+    def _run_tests(self, solution: Solution, problem: Problem) -> dict:
+        limit = settings.judge_output_limit
+        results = []
+        verdict = "accepted"
+        total_time = 0.0
+        for index, test_case in enumerate(problem.test_cases or []):
+            # Problems created before the blob store keep payloads inline
+            result = CodeExecutionService.execute_code(
+                CodeExecutionRequest(
+                    code=solution.code,
+                    language=solution.language,
+                    input_data=test_case.get("input", ""),
+                ),
+                input_ref=test_case.get("input_ref"),
+            )
+            total_time += result.execution_time or 0
+            output = result.output or ""
+            output_ref = test_case.get("output_ref")
+            if output_ref:
+                passed = result.success and blob_store.matches(output_ref, output.encode("utf-8"))
+            else:
+                passed = result.success and output.strip() == test_case.get("output", "").strip()
+            entry = {"test_case": index, "passed": passed, "execution_time": result.execution_time}
+            # Output, expected output and stderr of hidden tests would all
+            # leak the hidden input, which a solution can simply echo
+            if not test_case.get("hidden"):
+                entry["output"] = output[:limit]
+                if output_ref:
+                    entry["expected"] = blob_store.read_head(output_ref, limit)
+                else:
+                    entry["expected"] = test_case.get("output", "")[:limit]
+                if not result.success:
+                    entry["error"] = (result.error or "")[:limit]
+            results.append(entry)
+            if not passed:
+                if result.success:
+                    verdict = "wrong_answer"
+                elif (result.error or "").startswith("Code execution timed out"):
+                    verdict = "timeout"
+                else:
+                    verdict = "runtime_error"
+                # Later test cases cannot change the verdict
+                break
+        return {"status": verdict, "test_results": results, "execution_time": total_time}
+    
+    def judge(self, solution_id: int) -> Optional[dict]:
+        """Judge one solution; returns the stored result, or None if it was not claimable"""
+        db = self.session_factory()
+        try:
+            claimed_at = self._claim(db, solution_id)
+            if claimed_at is None:
+                return None
+            solution = db.query(Solution).filter(Solution.id == solution_id).first()
+            try:
+                outcome = self._run_tests(solution, solution.problem)
+            except Exception as exc:
+                logger.exception("Judging solution %d failed", solution_id)
+                outcome = {"status": "runtime_error", "test_results": [{"error": str(exc)}], "execution_time": None}
+            # Store the verdict only while the claim is still ours: a run that
+            # outlasted judge_claim_timeout may have been claimed again
+            stored = db.query(Solution).filter(
+                Solution.id == solution_id,
+                Solution.status == RUNNING,
+                Solution.claimed_at == claimed_at,
+            ).update({
+                Solution.status: outcome["status"],
+                Solution.test_results: outcome["test_results"],
+                Solution.execution_time: outcome["execution_time"],
+            }, synchronize_session=False)
+            if stored != 1:
+                db.rollback()
+                logger.warning("Solution %d was claimed again while being judged; dropping this verdict", solution_id)
+                return None
+            db.expire(solution)
+            ProblemStatsService.record_result(db, solution)
+            db.commit()
+            result = {
+                "solutionId": solution.id,
+                "userId": solution.user_id,
+                "problemId": solution.problem_id,
+                **outcome,
+            }
+            interview_id = solution.interview_id
+        finally:
+            db.close()
+        if self.notify is not None and interview_id is not None:
+            self.notify(interview_id, result)
+        return result
+    
+    def _run(self) -> None:
+        while True:
+            solution_id = self._queue.get()
+            if solution_id is None:
+                return
+            try:
+                self.judge(solution_id)
+            except Exception:
+                logger.exception("Judge worker failed on solution %d", solution_id)
+    
+    def start(self, notify: Optional[Callable[[int, dict], None]] = None) -> None:
+        """Start the workers and pick up submissions left queued"""
+        if self._threads:
+            return
+        self.notify = notify
+        self._threads = [
+            threading.Thread(target=self._run, name=f"judge-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.requeue_queued()
+    
+    def stop(self) -> None:
+        """Stop the workers once their current submission is stored
+
+        Submissions still waiting stay queued in the database and are picked
+        up by the next start().
+        """
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+judge_service = JudgeService()
+
+@registry.collector
+def _judge_metrics():
+    return [
+        ("judge_queue_depth", "gauge", "Submissions waiting to be judged",
+         [("judge_queue_depth", {}, judge_service.pending)]),
+    ]
@@ -0,0 +1,144 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Message
+
+logger = logging.getLogger(__name__)
+
+class MessageIngestionService:
+    """Buffers interview messages in memory and persists them in batched inserts"""
+    
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        # Unset limits follow the settings, so configure() applies to the shared instance
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._buffer: List[dict] = []
+        self._failures = 0  # consecutive failed flushes of the rows at the head of the buffer
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size or settings.message_batch_size
+    
+    @property
+    def flush_interval(self) -> float:
+        return self._flush_interval or settings.message_flush_interval
+    
+    @property
+    def max_retries(self) -> int:
+        return settings.message_flush_retries
+    
+    @property
+    def pending(self) -> int:
+        """Number of buffered messages not yet written"""
+        with self._lock:
+            return len(self._buffer)
+    
+    def enqueue(
+        self,
+        interview_id: int,
+        sender_id: int,
+        content: str,
+        message_type: str = "chat",
+    ) -> None:
+        """Buffer a message; the flusher writes it on the next size or time threshold"""
+        with self._lock:
+            self._buffer.append({
+                "interview_id": interview_id,
+                "sender_id": sender_id,
+                "content": content,
+                "message_type": message_type,
+                "created_at": datetime.utcnow(),
+            })
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+    
+    def flush(self) -> int:
+        """Write all buffered messages in a single transaction"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            if self._failures >= self.max_retries:
+                # Retrying the batch keeps failing: isolate the bad rows
+                self._failures = 0
+                return self._insert_one_by_one(batch)
+            db = self.session_factory()
+            try:
+                db.bulk_insert_mappings(Message, batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                self._failures += 1
+                # Put the batch back in front so ordering is preserved for the retry
+                with self._lock:
+                    self._buffer[:0] = batch
+                logger.exception(
+                    "Failed to flush %d messages (attempt %d of %d)",
+                    len(batch), self._failures, self.max_retries,
+                )
+                return 0
+            finally:
+                db.close()
+            self._failures = 0
+            return len(batch)
+    
+    def _insert_one_by_one(self, batch: List[dict]) -> int:
+        """Insert rows separately, dropping (and logging) the ones that fail"""
+        written = 0
+        db = self.session_factory()
+        try:
+            for row in batch:
+                try:
+                    db.bulk_insert_mappings(Message, [row])
+                    db.commit()
+                    written += 1
+                except Exception:
+                    db.rollback()
+                    logger.exception("Dropping message that cannot be stored: %r", row)
+        finally:
+            db.close()
+        return written
+    
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+    
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="message-ingestion", daemon=True
+        )
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop the flusher and drain the buffer"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+message_ingestion = MessageIngestionService()
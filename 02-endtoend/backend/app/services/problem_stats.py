@@ -0,0 +1,144 @@
+import math
+from typing import Dict, Optional
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import ProblemStats, Solution
+
+def runtime_bucket(seconds: float) -> int:
+    """Bucket a runtime in ms, keeping two significant digits"""
+    ms = max(int(round(seconds * 1000)), 0)
+    if ms < 100:
+        return ms
+    scale = 10 ** (int(math.log10(ms)) - 1)
+    return ms // scale * scale
+
+def histogram_median(histogram: Dict[str, int]) -> Optional[float]:
+    """Median (in seconds) of a {bucket_ms: count} histogram"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(histogram, key=int):
+        seen += histogram[bucket]
+        if seen * 2 >= total:
+            return int(bucket) / 1000
+    return None
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+class ProblemStatsService:
+    """Incrementally maintained per-problem submission statistics
+
+    Counters are bumped with a single UPDATE ... SET n = n + 1, which also
+    write-locks the row (SQLite locks the whole database) until the caller
+    commits. The JSON columns are read and rewritten only after that, so
+    concurrent submissions for one problem serialize instead of losing
+    updates.
+    """
+    
+    @staticmethod
+    def _ensure_row(db: Session, problem_id: int) -> None:
+        values = dict(
+            problem_id=problem_id,
+            submissions=0,
+            accepted=0,
+            language_counts={},
+            runtime_histogram={},
+        )
+        insert = _INSERTS.get(db.get_bind().dialect.name)
+        if insert is not None:
+            db.execute(insert(ProblemStats).values(**values).on_conflict_do_nothing())
+            return
+        # Other databases: insert in a savepoint and ignore the duplicate
+        try:
+            with db.begin_nested():
+                db.add(ProblemStats(**values))
+        except IntegrityError:
+            pass
+    
+    @staticmethod
+    def _increment(db: Session, solution: Solution, submissions: int) -> ProblemStats:
+        """Atomically bump the counters and return the locked, current row"""
+        ProblemStatsService._ensure_row(db, solution.problem_id)
+        accepted = 1 if solution.status == "accepted" else 0
+        db.execute(
+            update(ProblemStats)
+            .where(ProblemStats.problem_id == solution.problem_id)
+            .values(
+                submissions=ProblemStats.submissions + submissions,
+                accepted=ProblemStats.accepted + accepted,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return db.query(ProblemStats).filter(
+            ProblemStats.problem_id == solution.problem_id
+        ).populate_existing().one()
+    
+    @staticmethod
+    def _apply_runtime(stats: ProblemStats, solution: Solution) -> None:
+        if solution.status != "accepted":
+            return
+        if solution.execution_time is not None:
+            # JSON columns only persist on reassignment
+            histogram = dict(stats.runtime_histogram or {})
+            bucket = str(runtime_bucket(solution.execution_time))
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+            stats.runtime_histogram = histogram
+            stats.median_runtime = histogram_median(histogram)
+    
+    @staticmethod
+    def record_submission(db: Session, solution: Solution) -> None:
+        """Count a new submission (caller commits, in the same transaction)"""
+        stats = ProblemStatsService._increment(db, solution, submissions=1)
+        language_counts = dict(stats.language_counts or {})
+        language_counts[solution.language] = language_counts.get(solution.language, 0) + 1
+        stats.language_counts = language_counts
+        ProblemStatsService._apply_runtime(stats, solution)
+    
+    @staticmethod
+    def record_result(db: Session, solution: Solution) -> None:
+        """Count the verdict of a submission judged after it was recorded"""
+        if solution.status != "accepted":
+            return
+        stats = ProblemStatsService._increment(db, solution, submissions=0)
+        ProblemStatsService._apply_runtime(stats, solution)
+    
+    @staticmethod
+    def rebuild_all(db: Session) -> int:
+        """Recompute every problem's statistics from the solutions table"""
+        db.query(ProblemStats).delete()
+        rebuilt = {}
+        for solution in db.query(Solution).order_by(Solution.id).yield_per(1000):
+            stats = rebuilt.get(solution.problem_id)
+            if stats is None:
+                stats = rebuilt[solution.problem_id] = ProblemStats(
+                    problem_id=solution.problem_id,
+                    submissions=0,
+                    accepted=0,
+                    language_counts={},
+                    runtime_histogram={},
+                )
+            stats.submissions += 1
+            stats.language_counts[solution.language] = (
+                stats.language_counts.get(solution.language, 0) + 1
+            )
+            if solution.status == "accepted":
+                stats.accepted += 1
+            ProblemStatsService._apply_runtime(stats, solution)
+        db.add_all(rebuilt.values())
+        db.commit()
+        return len(rebuilt)
+
+if __name__ == "__main__":
+    # One-shot backfill: python -m app.services.problem_stats
+    from app.core.database import SessionLocal, init_engine
+    
+    init_engine()
+    db = SessionLocal()
+    try:
+        count = ProblemStatsService.rebuild_all(db)
+        print(f"Rebuilt statistics for {count} problems")
+    finally:
+        db.close()
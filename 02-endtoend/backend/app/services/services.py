@@ -1,7 +1,11 @@
 from sqlalchemy.orm import Session
-from app.models import User, Problem, Interview, Solution
+from app.models import User, Problem, Interview, Solution, Message
 from app.schemas import UserCreate, UserResponse, ProblemCreate, InterviewCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.config import settings
+from app.core.dependencies import invalidate_user
+from app.core.security import get_password_hash, verify_and_update_password
+from app.services.blob_store import blob_store
+from app.services.problem_stats import ProblemStatsService
 from typing import Optional, List
 
 class UserService:
@@ -32,17 +36,48 @@ class UserService:
         user = UserService.get_user_by_email(db, email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            # Cost factor changed since this hash was made: upgrade it transparently
+            user.hashed_password = new_hash
+            db.commit()
+            invalidate_user(user.id)
         return user
 
 class ProblemService:
     """Service for problem operations"""
     
+    @staticmethod
+    def externalize_test_cases(test_cases: List[dict]) -> List[dict]:
+        """Move test case inputs/outputs into the blob store, keeping hash references
+
+        Small payloads of visible test cases are also kept inline, so clients
+        can show them as examples without fetching the blobs.
+        """
+        limit = settings.test_case_inline_limit
+        externalized = []
+        for test_case in test_cases:
+            test_case = dict(test_case)
+            for field in ("input", "output"):
+                if field not in test_case:
+                    continue
+                payload = test_case.pop(field) or ""
+                test_case[f"{field}_ref"] = blob_store.put(payload)
+                if not test_case.get("hidden") and len(payload.encode("utf-8")) <= limit:
+                    test_case[field] = payload
+            externalized.append(test_case)
+        return externalized
+    
     @staticmethod
     def create_problem(db: Session, problem: ProblemCreate) -> Problem:
         """Create a new problem"""
-        db_problem = Problem(**problem.dict())
+        problem_data = problem.dict()
+        problem_data["test_cases"] = ProblemService.externalize_test_cases(
+            problem_data["test_cases"]
+        )
+        db_problem = Problem(**problem_data)
         db.add(db_problem)
         db.commit()
         db.refresh(db_problem)
@@ -90,9 +125,10 @@ class SolutionService:
     
     @staticmethod
     def create_solution(db: Session, solution_data: dict) -> Solution:
-        """Create a new solution"""
+        """Create a new solution and update problem statistics in the same transaction"""
         db_solution = Solution(**solution_data)
         db.add(db_solution)
+        ProblemStatsService.record_submission(db, db_solution)
         db.commit()
         db.refresh(db_solution)
         return db_solution
@@ -106,3 +142,15 @@ class SolutionService:
     def get_interview_solutions(db: Session, interview_id: int) -> List[Solution]:
         """Get all solutions for an interview"""
         return db.query(Solution).filter(Solution.interview_id == interview_id).all()
+
+class MessageService:
+    """Service for message operations"""
+    
+    @staticmethod
+    def get_interview_messages(
+        db: Session, interview_id: int, skip: int = 0, limit: int = 50
+    ) -> List[Message]:
+        """Get persisted messages for an interview in send order"""
+        return db.query(Message).filter(
+            Message.interview_id == interview_id
+        ).order_by(Message.id).offset(skip).limit(limit).all()
@@ -0,0 +1,155 @@
+import difflib
+import json
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import rebuilt_on_configure, settings
+from app.models import CodeSnapshot
+
+def make_delta(old: str, new: str) -> List[list]:
+    """Compute edit ops [start, end, replacement] that turn old into new"""
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    return [
+        [i1, i2, new[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+def apply_delta(old: str, ops: List[list]) -> str:
+    """Apply edit ops produced by make_delta"""
+    parts = []
+    position = 0
+    for start, end, replacement in ops:
+        parts.append(old[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(old[position:])
+    return "".join(parts)
+
+@rebuilt_on_configure
+@lru_cache(maxsize=None)
+def _head_cache() -> TTLCache:
+    """Last (seq, code) per (interview_id, user_id), so recording a snapshot
+    only needs to diff against memory instead of rebuilding from the DB"""
+    return TTLCache(maxsize=settings.snapshot_head_cache_size)
+
+class SnapshotService:
+    """Keyframe + delta history of candidate code per interview and user"""
+    
+    @staticmethod
+    def _decode(snapshot: CodeSnapshot, previous: Optional[str]) -> str:
+        data = zlib.decompress(snapshot.payload).decode("utf-8")
+        if snapshot.is_keyframe:
+            return data
+        return apply_delta(previous or "", json.loads(data))
+    
+    @staticmethod
+    def _head(db: Session, interview_id: int, user_id: int) -> Tuple[int, Optional[str]]:
+        last_seq = db.query(func.max(CodeSnapshot.seq)).filter(
+            CodeSnapshot.interview_id == interview_id,
+            CodeSnapshot.user_id == user_id,
+        ).scalar()
+        if last_seq is None:
+            return 0, None
+        head = _head_cache().get((interview_id, user_id))
+        # The cached head is only trusted if no other worker wrote after it
+        if head and head[0] == last_seq:
+            return head
+        code = SnapshotService.get_code_at(db, interview_id, user_id, seq=last_seq)
+        return last_seq, code
+    
+    @staticmethod
+    def record_snapshot(
+        db: Session, interview_id: int, user_id: int, code: str
+    ) -> Optional[CodeSnapshot]:
+        """Store a snapshot as a compressed delta (or keyframe); None if unchanged
+
+        Another worker can take the next seq between reading the head and
+        committing; the unique stream index rejects that write and it is
+        retried on top of the new head.
+        """
+        attempts = settings.snapshot_write_attempts
+        for attempt in range(1, attempts + 1):
+            try:
+                return SnapshotService._write_snapshot(db, interview_id, user_id, code)
+            except IntegrityError:
+                db.rollback()
+                if attempt == attempts:
+                    raise
+    
+    @staticmethod
+    def _write_snapshot(
+        db: Session, interview_id: int, user_id: int, code: str
+    ) -> Optional[CodeSnapshot]:
+        seq, previous = SnapshotService._head(db, interview_id, user_id)
+        if previous == code:
+            return None
+        
+        seq += 1
+        is_keyframe = previous is None or (seq - 1) % settings.snapshot_keyframe_interval == 0
+        if is_keyframe:
+            data = code
+        else:
+            data = json.dumps(make_delta(previous, code), separators=(",", ":"))
+        
+        db_snapshot = CodeSnapshot(
+            interview_id=interview_id,
+            user_id=user_id,
+            seq=seq,
+            is_keyframe=is_keyframe,
+            payload=zlib.compress(data.encode("utf-8")),
+        )
+        db.add(db_snapshot)
+        db.commit()
+        db.refresh(db_snapshot)
+        _head_cache().set((interview_id, user_id), (seq, code))
+        return db_snapshot
+    
+    @staticmethod
+    def get_code_at(
+        db: Session,
+        interview_id: int,
+        user_id: int,
+        at: Optional[datetime] = None,
+        seq: Optional[int] = None,
+    ) -> Optional[str]:
+        """Rebuild the code as of a timestamp (or sequence number)"""
+        query = db.query(CodeSnapshot).filter(
+            CodeSnapshot.interview_id == interview_id,
+            CodeSnapshot.user_id == user_id,
+        )
+        if at is not None:
+            query = query.filter(CodeSnapshot.created_at <= at)
+        if seq is not None:
+            query = query.filter(CodeSnapshot.seq <= seq)
+        
+        keyframe = query.filter(CodeSnapshot.is_keyframe.is_(True)).order_by(
+            CodeSnapshot.seq.desc()
+        ).first()
+        if not keyframe:
+            return None
+        
+        code = SnapshotService._decode(keyframe, None)
+        deltas = query.filter(CodeSnapshot.seq > keyframe.seq).order_by(CodeSnapshot.seq)
+        for snapshot in deltas:
+            code = SnapshotService._decode(snapshot, code)
+        return code
+    
+    @staticmethod
+    def iter_replay(
+        db: Session, interview_id: int, user_id: int
+    ) -> Iterator[Tuple[CodeSnapshot, str]]:
+        """Yield every snapshot with its rebuilt code, oldest first"""
+        snapshots = db.query(CodeSnapshot).filter(
+            CodeSnapshot.interview_id == interview_id,
+            CodeSnapshot.user_id == user_id,
+        ).order_by(CodeSnapshot.seq).yield_per(200)
+        code = None
+        for snapshot in snapshots:
+            code = SnapshotService._decode(snapshot, code)
+            yield snapshot, code
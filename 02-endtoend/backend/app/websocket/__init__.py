@@ -0,0 +1,28 @@
+from .document import OperationError, SharedDocument
+from .presence import PresenceTracker
+from .pubsub import (
+    InProcessPubSub,
+    LocalSocketBroker,
+    LocalSocketPubSub,
+    PubSub,
+    RedisPubSub,
+    create_pubsub,
+)
+from .hub import CollaborationHub, Connection, Room, hub, make_event
+
+__all__ = [
+    "CollaborationHub",
+    "Connection",
+    "InProcessPubSub",
+    "LocalSocketBroker",
+    "LocalSocketPubSub",
+    "OperationError",
+    "PresenceTracker",
+    "PubSub",
+    "RedisPubSub",
+    "Room",
+    "SharedDocument",
+    "create_pubsub",
+    "hub",
+    "make_event",
+]
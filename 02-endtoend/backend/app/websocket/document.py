@@ -0,0 +1,196 @@
+"""
+Operational transform for the shared editor
+
+An operation is a list of components applied left to right over the
+document: a positive int retains that many characters, a negative int
+deletes that many, and a string inserts it. Lengths are in Unicode code
+points.
+"""
+
+import zlib
+from collections import deque
+from typing import Deque, List, Optional, Tuple, Union
+from app.core.config import settings
+
+Component = Union[int, str]
+Operation = List[Component]
+
+class OperationError(ValueError):
+    """Raised for malformed operations or ones that do not fit the document"""
+
+def _is_retain(c) -> bool:
+    return isinstance(c, int) and c > 0
+
+def _is_delete(c) -> bool:
+    return isinstance(c, int) and c < 0
+
+def _is_insert(c) -> bool:
+    return isinstance(c, str)
+
+class _Builder:
+    """Appends components while merging neighbours into canonical form"""
+    
+    def __init__(self):
+        self.ops: Operation = []
+    
+    def retain(self, n: int) -> None:
+        if n <= 0:
+            return
+        if self.ops and _is_retain(self.ops[-1]):
+            self.ops[-1] += n
+        else:
+            self.ops.append(n)
+    
+    def insert(self, s: str) -> None:
+        if not s:
+            return
+        ops = self.ops
+        if ops and _is_insert(ops[-1]):
+            ops[-1] += s
+        elif ops and _is_delete(ops[-1]):
+            # Keep inserts ahead of deletes so equal edits compare equal
+            if len(ops) > 1 and _is_insert(ops[-2]):
+                ops[-2] += s
+            else:
+                ops.insert(len(ops) - 1, s)
+        else:
+            ops.append(s)
+    
+    def delete(self, n: int) -> None:
+        if n <= 0:
+            return
+        if self.ops and _is_delete(self.ops[-1]):
+            self.ops[-1] -= n
+        else:
+            self.ops.append(-n)
+
+def base_length(ops: Operation) -> int:
+    """Length of the document an operation applies to"""
+    return sum(c if _is_retain(c) else -c for c in ops if not _is_insert(c))
+
+def validate(ops) -> Operation:
+    """Check an operation received from a client"""
+    if not isinstance(ops, list):
+        raise OperationError("Operation must be a list")
+    for c in ops:
+        if isinstance(c, bool) or not isinstance(c, (int, str)) or c == 0 or c == "":
+            raise OperationError(f"Invalid component {c!r}")
+    return ops
+
+def apply(text: str, ops: Operation) -> str:
+    """Apply an operation to a document"""
+    if base_length(ops) != len(text):
+        raise OperationError("Operation does not match document length")
+    parts = []
+    index = 0
+    for c in ops:
+        if _is_insert(c):
+            parts.append(c)
+        elif c > 0:
+            parts.append(text[index:index + c])
+            index += c
+        else:
+            index -= c
+    return "".join(parts)
+
+def transform(a: Operation, b: Operation) -> Tuple[Operation, Operation]:
+    """Transform concurrent a and b into a', b' with b∘a' == a∘b'"""
+    if base_length(a) != base_length(b):
+        raise OperationError("Concurrent operations must share a base document")
+    a_prime, b_prime = _Builder(), _Builder()
+    ia, ib = iter(a), iter(b)
+    op1, op2 = next(ia, None), next(ib, None)
+    
+    while op1 is not None or op2 is not None:
+        # Inserts from a win ties, which keeps the result deterministic
+        if op1 is not None and _is_insert(op1):
+            a_prime.insert(op1)
+            b_prime.retain(len(op1))
+            op1 = next(ia, None)
+            continue
+        if op2 is not None and _is_insert(op2):
+            a_prime.retain(len(op2))
+            b_prime.insert(op2)
+            op2 = next(ib, None)
+            continue
+        if op1 is None or op2 is None:
+            raise OperationError("Operations have different lengths")
+        
+        if _is_retain(op1) and _is_retain(op2):
+            n = min(op1, op2)
+            a_prime.retain(n)
+            b_prime.retain(n)
+            op1, op2 = op1 - n, op2 - n
+        elif _is_delete(op1) and _is_delete(op2):
+            # Both deleted the same text: nothing left to do for either
+            n = min(-op1, -op2)
+            op1, op2 = op1 + n, op2 + n
+        elif _is_delete(op1) and _is_retain(op2):
+            n = min(-op1, op2)
+            a_prime.delete(n)
+            op1, op2 = op1 + n, op2 - n
+        else:
+            n = min(op1, -op2)
+            b_prime.delete(n)
+            op1, op2 = op1 - n, op2 + n
+        
+        if op1 == 0:
+            op1 = next(ia, None)
+        if op2 == 0:
+            op2 = next(ib, None)
+    
+    return a_prime.ops, b_prime.ops
+
+def replace_all(old: str, new: str) -> Operation:
+    """Operation that swaps the whole document (for full-text updates)"""
+    builder = _Builder()
+    builder.insert(new)
+    builder.delete(len(old))
+    return builder.ops
+
+class SharedDocument:
+    """Server-authoritative document of an interview room"""
+    
+    def __init__(self, text: str = "", version: int = 0, history: Optional[int] = None):
+        self.text = text
+        self.version = version
+        self._history: Deque[Operation] = deque(maxlen=history or settings.ws_document_history)
+    
+    @property
+    def checksum(self) -> int:
+        return zlib.crc32(self.text.encode("utf-8"))
+    
+    def apply_client_op(self, client_version: int, ops: Operation) -> Operation:
+        """Rebase an op made against client_version onto the head and apply it"""
+        validate(ops)
+        behind = self.version - client_version
+        if behind < 0 or behind > len(self._history):
+            raise OperationError("Client version is out of range, resync required")
+        for concurrent in list(self._history)[len(self._history) - behind:]:
+            ops, _ = transform(ops, concurrent)
+        self.text = apply(self.text, ops)
+        self._history.append(ops)
+        self.version += 1
+        return ops
+    
+    def replace(self, text: str) -> Operation:
+        """Replace the whole document, recording it as an operation"""
+        ops = replace_all(self.text, text)
+        self.text = text
+        self._history.append(ops)
+        self.version += 1
+        return ops
+    
+    def export(self) -> dict:
+        """State needed to continue rebasing identically elsewhere"""
+        return {"text": self.text, "version": self.version, "history": list(self._history)}
+    
+    def load(self, state: dict) -> None:
+        """Adopt state exported by another worker"""
+        self.text = state["text"]
+        self.version = state["version"]
+        self._history.clear()
+        self._history.extend(state["history"])
+    
+    def needs_checksum(self) -> bool:
+        return self.version % settings.ws_checksum_interval == 0
@@ -0,0 +1,385 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Hashable, List, Optional
+from fastapi import WebSocket
+from app.core.config import settings
+from app.services import message_ingestion
+from .document import OperationError, SharedDocument
+from .presence import PresenceTracker
+from .pubsub import PubSub, create_pubsub
+
+logger = logging.getLogger(__name__)
+
+def make_event(event: str, data: dict) -> dict:
+    """Build a server-to-client frame"""
+    return {"event": event, "data": data, "timestamp": datetime.utcnow().isoformat()}
+
+class Connection:
+    """One participant's socket with a bounded outgoing queue"""
+    
+    def __init__(self, websocket: WebSocket, user_id: int, max_queue: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.user_id = user_id
+        self.max_queue = max_queue or settings.ws_send_queue_size
+        self.dropped = 0
+        # Entries are [coalesce_key, frame] so a pending frame can be replaced in place
+        self._queue: Deque[list] = deque()
+        self._pending: Dict[Hashable, list] = {}
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._sender: Optional[asyncio.Task] = None
+    
+    def start(self) -> None:
+        self._sender = asyncio.create_task(self._send_loop())
+    
+    def offer(self, frame: dict, coalesce_key: Optional[Hashable] = None) -> None:
+        """Queue a frame without ever waiting on the socket"""
+        if self._closed:
+            return
+        if coalesce_key is not None:
+            entry = self._pending.get(coalesce_key)
+            if entry is not None:
+                # Not sent yet: the newer state supersedes it
+                entry[1] = frame
+                return
+        if len(self._queue) >= self.max_queue:
+            self._drop_one()
+        entry = [coalesce_key, frame]
+        self._queue.append(entry)
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = entry
+        self._wake.set()
+    
+    def _drop_one(self) -> None:
+        # Superseded-state frames (cursor, code) go first: the next one repairs
+        # them, whereas a dropped chat message is gone for good
+        victim = next((entry for entry in self._queue if entry[0] is not None), None)
+        if victim is None:
+            self._queue.popleft()
+        else:
+            self._queue.remove(victim)
+            self._pending.pop(victim[0], None)
+        self.dropped += 1
+    
+    async def _send_loop(self) -> None:
+        try:
+            while not self._closed:
+                if not self._queue:
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                key, frame = self._queue.popleft()
+                if key is not None:
+                    self._pending.pop(key, None)
+                await self.websocket.send_json(frame)
+        except Exception:
+            # The receive side notices the disconnect and cleans up
+            self._closed = True
+    
+    async def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        if self._sender:
+            self._sender.cancel()
+            try:
+                await self._sender
+            except (asyncio.CancelledError, Exception):
+                pass
+
+class Room:
+    """State of one interview, replicated on every worker with local participants
+
+    Client actions are published as commands on the room's channel and every
+    worker (the sender included) applies them in channel order, so document
+    versions and event sequence numbers agree everywhere.
+    """
+    
+    def __init__(self, interview_id: int, hub: "CollaborationHub"):
+        self.interview_id = interview_id
+        self.hub = hub
+        self.connections: Dict[str, Connection] = {}
+        self.document = SharedDocument()
+        self.presence = PresenceTracker(self._flush_presence)
+        self.seq = 0
+        self.events: Deque[dict] = deque(maxlen=settings.ws_replay_buffer)
+        self.recent_chat: Deque[dict] = deque(maxlen=50)
+        self.last_test_result: Optional[dict] = None
+        # Sync with peers: commands seen before/after our own sync-request echo
+        self._synced = asyncio.Event()
+        self._request_seen = False
+        self._before_sync: List[dict] = []
+        self._after_sync: List[dict] = []
+    
+    @property
+    def channel(self) -> str:
+        return f"interview:{self.interview_id}"
+    
+    def _flush_presence(self, cursors: List[dict]) -> None:
+        self.broadcast(
+            make_event("presence-updated", {"cursors": cursors}),
+            coalesce_key="presence",
+        )
+    
+    def broadcast(
+        self,
+        frame: dict,
+        exclude: Optional[str] = None,
+        coalesce_key: Optional[Hashable] = None,
+    ) -> None:
+        """Fan out to local participants; a slow one never delays the others"""
+        for connection_id, connection in list(self.connections.items()):
+            if connection_id != exclude:
+                connection.offer(frame, coalesce_key)
+    
+    def publish(
+        self,
+        frame: dict,
+        exclude: Optional[str] = None,
+        coalesce_key: Optional[Hashable] = None,
+    ) -> dict:
+        """Sequence a room event, keep it for replay and broadcast it"""
+        self.seq += 1
+        frame = {**frame, "seq": self.seq}
+        self.events.append(frame)
+        if frame["event"] == "new-chat-message":
+            self.recent_chat.append(frame)
+        elif frame["event"] == "test-result-update":
+            self.last_test_result = frame
+        self.broadcast(frame, exclude=exclude, coalesce_key=coalesce_key)
+        return frame
+    
+    def send_state(self, connection_id: str) -> None:
+        connection = self.connections.get(connection_id)
+        if connection is not None:
+            connection.offer(make_event("code-state", {
+                "version": self.document.version,
+                "code": self.document.text,
+            }))
+    
+    def snapshot(self) -> dict:
+        """Everything a late joiner needs in one frame"""
+        return make_event("room-snapshot", {
+            "seq": self.seq,
+            "code": self.document.text,
+            "version": self.document.version,
+            "chat": list(self.recent_chat),
+            "testResult": self.last_test_result,
+            "participants": sorted({c.user_id for c in self.connections.values()}),
+            "presence": self.presence.snapshot(),
+        })
+    
+    def resume(self, last_seq: Optional[int]) -> dict:
+        """Missing events since last_seq, or a snapshot if they are no longer buffered"""
+        if last_seq is None or last_seq > self.seq:
+            return self.snapshot()
+        oldest = self.events[0]["seq"] if self.events else self.seq + 1
+        if last_seq < oldest - 1:
+            return self.snapshot()
+        missed = [frame for frame in self.events if frame["seq"] > last_seq]
+        return make_event("room-resume", {"seq": self.seq, "events": missed})
+    
+    def export_state(self) -> dict:
+        return {
+            "document": self.document.export(),
+            "seq": self.seq,
+            "events": list(self.events),
+            "chat": list(self.recent_chat),
+            "testResult": self.last_test_result,
+        }
+    
+    def import_state(self, state: dict) -> None:
+        self.document.load(state["document"])
+        self.seq = state["seq"]
+        self.events.clear()
+        self.events.extend(state["events"])
+        self.recent_chat.clear()
+        self.recent_chat.extend(state["chat"])
+        self.last_test_result = state["testResult"]
+    
+    async def sync(self) -> None:
+        """Adopt the room state from peer workers before serving anyone"""
+        if not self.hub.pubsub.shared:
+            self._finish_sync(None)
+            return
+        self.hub.dispatch(self.interview_id, {"type": "sync-request"})
+        try:
+            await asyncio.wait_for(self._synced.wait(), settings.pubsub_sync_timeout)
+        except asyncio.TimeoutError:
+            # Nobody else has this room: everything we saw is the history
+            self._finish_sync(None)
+    
+    def _finish_sync(self, state: Optional[dict]) -> None:
+        if self._synced.is_set():
+            return
+        if state is not None:
+            # The snapshot already reflects everything before our request
+            self.import_state(state)
+            pending = self._after_sync
+        else:
+            pending = self._before_sync + self._after_sync
+        self._before_sync, self._after_sync = [], []
+        self._synced.set()
+        for command in pending:
+            self.process(command)
+    
+    def receive(self, command: dict) -> None:
+        """Channel callback"""
+        if self._synced.is_set():
+            self.process(command)
+            return
+        own = command.get("node") == self.hub.node_id
+        if command["type"] == "sync-request" and own:
+            self._request_seen = True
+        elif command["type"] == "sync" and command.get("to") == self.hub.node_id:
+            if self._request_seen:
+                self._finish_sync(command["state"])
+        elif self._request_seen:
+            self._after_sync.append(command)
+        else:
+            self._before_sync.append(command)
+    
+    def process(self, command: dict) -> None:
+        """Apply a room command; runs on every worker in the same order"""
+        kind = command["type"]
+        user_id = command.get("userId")
+        connection_id = command.get("connection")
+        origin = command.get("node") == self.hub.node_id
+        
+        if kind == "sync-request":
+            if not origin:
+                self.hub.dispatch(self.interview_id, {
+                    "type": "sync", "to": command["node"], "state": self.export_state(),
+                })
+        elif kind == "join":
+            self.publish(make_event("user-joined", {"userId": user_id}), exclude=connection_id)
+        elif kind == "leave":
+            self.presence.remove(user_id)
+            self.publish(make_event("user-left", {"userId": user_id}))
+        elif kind == "code-delta":
+            try:
+                ops = self.document.apply_client_op(command["version"], command["ops"])
+            except (OperationError, TypeError, ValueError):
+                # Stale or malformed: hand the client the authoritative state
+                self.send_state(connection_id)
+                return
+            version = self.document.version
+            connection = self.connections.get(connection_id)
+            if connection is not None:
+                connection.offer(make_event("code-ack", {"version": version}))
+            self.publish(
+                make_event("code-delta", {"version": version, "ops": ops, "userId": user_id}),
+                exclude=connection_id,
+            )
+            self._maybe_checksum()
+            if origin:
+                message_ingestion.enqueue(
+                    self.interview_id, user_id,
+                    json.dumps({"version": version, "ops": ops}), "code_update",
+                )
+        elif kind == "code-update":
+            # Full-text update from clients that do not speak deltas
+            self.document.replace(command["code"])
+            self.publish(
+                make_event("code-updated", {
+                    "code": command["code"],
+                    "userId": user_id,
+                    "version": self.document.version,
+                }),
+                exclude=connection_id,
+                coalesce_key=("code", user_id),
+            )
+            self._maybe_checksum()
+            if origin:
+                message_ingestion.enqueue(self.interview_id, user_id, command["code"], "code_update")
+        elif kind == "chat-message":
+            self.publish(make_event("new-chat-message", {"message": command["message"], "userId": user_id}))
+            if origin:
+                message_ingestion.enqueue(self.interview_id, user_id, command["message"], "chat")
+        elif kind == "test-result":
+            self.publish(make_event("test-result-update", {"result": command["result"], "userId": user_id}))
+        elif kind == "submission-result":
+            # Verdict from the background judge (see app.services.judge)
+            self.publish(make_event("submission-judged", command["result"]))
+        elif kind == "cursor-move":
+            # Coalesced and sent as presence-updated at ws_presence_rate
+            self.presence.update(user_id, command["state"])
+    
+    def _maybe_checksum(self) -> None:
+        if self.document.needs_checksum():
+            self.broadcast(make_event("code-checksum", {
+                "version": self.document.version,
+                "checksum": self.document.checksum,
+            }))
+
+class CollaborationHub:
+    """Interview rooms for real-time collaboration"""
+    
+    def __init__(self, pubsub: Optional[PubSub] = None):
+        self.node_id = uuid.uuid4().hex
+        self.pubsub = pubsub
+        self.rooms: Dict[int, Room] = {}
+        self._expiry: Dict[int, asyncio.TimerHandle] = {}
+    
+    async def start(self) -> None:
+        """Connect the configured pub/sub backend"""
+        if self.pubsub is None:
+            self.pubsub = create_pubsub()
+        await self.pubsub.start()
+    
+    async def stop(self) -> None:
+        if self.pubsub is not None:
+            await self.pubsub.close()
+    
+    def dispatch(self, interview_id: int, command: dict) -> None:
+        """Publish a room command to every worker"""
+        command["node"] = self.node_id
+        self.pubsub.publish(f"interview:{interview_id}", command)
+    
+    async def join(self, interview_id: int, connection: Connection) -> Room:
+        """Add a connection to an interview room"""
+        expiry = self._expiry.pop(interview_id, None)
+        if expiry is not None:
+            expiry.cancel()
+        room = self.rooms.get(interview_id)
+        if room is None:
+            room = self.rooms[interview_id] = Room(interview_id, self)
+            await self.pubsub.subscribe(room.channel, room.receive)
+            await room.sync()
+        else:
+            await room._synced.wait()
+        room.connections[connection.id] = connection
+        connection.start()
+        return room
+    
+    async def _expire(self, interview_id: int) -> None:
+        self._expiry.pop(interview_id, None)
+        room = self.rooms.get(interview_id)
+        if room is not None and not room.connections:
+            del self.rooms[interview_id]
+            await self.pubsub.unsubscribe(room.channel, room.receive)
+    
+    async def leave(self, interview_id: int, connection: Connection) -> None:
+        """Remove a connection; an empty room keeps its state for ws_room_idle_ttl"""
+        room = self.rooms.get(interview_id)
+        if room is not None:
+            room.connections.pop(connection.id, None)
+            if not room.connections:
+                room.presence.close()
+                # Reconnecting participants still find the code and history
+                loop = asyncio.get_running_loop()
+                self._expiry[interview_id] = loop.call_later(
+                    settings.ws_room_idle_ttl,
+                    lambda: loop.create_task(self._expire(interview_id)),
+                )
+        await connection.close()
+    
+    def participants(self, interview_id: int) -> List[int]:
+        room = self.rooms.get(interview_id)
+        return sorted({c.user_id for c in room.connections.values()}) if room else []
+
+hub = CollaborationHub()
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Set
+from app.core.config import settings
+
+class PresenceTracker:
+    """Latest cursor/selection per participant, flushed to the room at a fixed tick"""
+    
+    # Ticks without changes before the ticker task exits (restarted on next update)
+    IDLE_TICKS = 20
+    
+    def __init__(self, on_flush: Callable[[List[dict]], None], rate: Optional[float] = None):
+        self.on_flush = on_flush
+        self.interval = 1.0 / (rate or settings.ws_presence_rate)
+        self._states: Dict[int, dict] = {}
+        self._dirty: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+    
+    def update(self, user_id: int, state: dict) -> None:
+        """Record a participant's latest presence; older unsent states are superseded"""
+        self._states[user_id] = state
+        self._dirty.add(user_id)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    def remove(self, user_id: int) -> None:
+        self._states.pop(user_id, None)
+        self._dirty.discard(user_id)
+    
+    def snapshot(self) -> List[dict]:
+        """Presence of every participant (for late joiners)"""
+        return [{"userId": user_id, **state} for user_id, state in self._states.items()]
+    
+    def flush(self) -> None:
+        """Emit the changed presences as one frame"""
+        if not self._dirty:
+            return
+        changed = [
+            {"userId": user_id, **self._states[user_id]}
+            for user_id in self._dirty
+            if user_id in self._states
+        ]
+        self._dirty.clear()
+        if changed:
+            self.on_flush(changed)
+    
+    async def _run(self) -> None:
+        idle = 0
+        try:
+            while idle < self.IDLE_TICKS:
+                await asyncio.sleep(self.interval)
+                if self._dirty:
+                    idle = 0
+                    self.flush()
+                else:
+                    # Nothing moved: send nothing
+                    idle += 1
+        finally:
+            self._task = None
+    
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[dict], None]
+
+# Line limit for the local socket protocol (room state syncs can be large)
+STREAM_LIMIT = 16 * 1024 * 1024
+
+class PubSub:
+    """Channel fan-out with per-channel subscription ref-counting"""
+    
+    # Whether other processes may publish on the same channels
+    shared = True
+    
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callback]] = defaultdict(list)
+    
+    async def start(self) -> None:
+        pass
+    
+    async def close(self) -> None:
+        pass
+    
+    async def subscribe(self, channel: str, callback: Callback) -> None:
+        """Register a callback; the backend subscribes on the first one"""
+        callbacks = self._subscribers[channel]
+        callbacks.append(callback)
+        if len(callbacks) == 1:
+            await self._subscribe(channel)
+    
+    async def unsubscribe(self, channel: str, callback: Callback) -> None:
+        """Drop a callback; the backend unsubscribes with the last one"""
+        callbacks = self._subscribers.get(channel)
+        if not callbacks or callback not in callbacks:
+            return
+        callbacks.remove(callback)
+        if not callbacks:
+            del self._subscribers[channel]
+            await self._unsubscribe(channel)
+    
+    def publish(self, channel: str, message: dict) -> None:
+        """Publish without waiting; every subscriber, including this process, gets it in order"""
+        raise NotImplementedError
+    
+    async def _subscribe(self, channel: str) -> None:
+        pass
+    
+    async def _unsubscribe(self, channel: str) -> None:
+        pass
+    
+    def _deliver(self, channel: str, message: dict) -> None:
+        for callback in list(self._subscribers.get(channel, ())):
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Subscriber of %s failed", channel)
+
+class InProcessPubSub(PubSub):
+    """Single-process delivery through the event loop"""
+    
+    shared = False
+    
+    def publish(self, channel: str, message: dict) -> None:
+        asyncio.get_running_loop().call_soon(self._deliver, channel, message)
+
+class BatchingPubSub(PubSub):
+    """Collects published messages per channel and sends them as one batch"""
+    
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        batch_interval: Optional[float] = None,
+    ):
+        super().__init__()
+        self.batch_size = batch_size or settings.pubsub_batch_size
+        self.batch_interval = batch_interval if batch_interval is not None else settings.pubsub_batch_interval
+        self._outbox: Dict[str, List[dict]] = defaultdict(list)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches: "asyncio.Queue[Dict[str, List[dict]]]" = asyncio.Queue()
+        self._sender: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        # One sender keeps batches in publish order
+        self._sender = asyncio.create_task(self._send_loop())
+    
+    async def close(self) -> None:
+        self._flush()
+        if self._sender:
+            await self._batches.join()
+            self._sender.cancel()
+            self._sender = None
+    
+    def publish(self, channel: str, message: dict) -> None:
+        pending = self._outbox[channel]
+        pending.append(message)
+        if len(pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_interval, self._flush
+            )
+    
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._outbox:
+            batch, self._outbox = self._outbox, defaultdict(list)
+            self._batches.put_nowait(batch)
+    
+    async def _send_loop(self) -> None:
+        while True:
+            batch = await self._batches.get()
+            try:
+                await self._send(batch)
+            except Exception:
+                logger.exception("Failed to publish %d channel batches", len(batch))
+            finally:
+                self._batches.task_done()
+    
+    async def _send(self, batch: Dict[str, List[dict]]) -> None:
+        raise NotImplementedError
+    
+    def _deliver_batch(self, channel: str, payload) -> None:
+        for message in json.loads(payload):
+            self._deliver(channel, message)
+
+class RedisPubSub(BatchingPubSub):
+    """Fan-out across workers and hosts through Redis channels"""
+    
+    def __init__(self, url: str, **kwargs):
+        super().__init__(**kwargs)
+        import redis.asyncio as redis
+        
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._reader: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        await super().start()
+        self._reader = asyncio.create_task(self._read_loop())
+    
+    async def close(self) -> None:
+        await super().close()
+        if self._reader:
+            self._reader.cancel()
+            self._reader = None
+        await self._pubsub.close()
+        await self._client.close()
+    
+    async def _subscribe(self, channel: str) -> None:
+        await self._pubsub.subscribe(channel)
+    
+    async def _unsubscribe(self, channel: str) -> None:
+        await self._pubsub.unsubscribe(channel)
+    
+    async def _send(self, batch: Dict[str, List[dict]]) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for channel, messages in batch.items():
+                pipe.publish(channel, json.dumps(messages))
+            await pipe.execute()
+    
+    async def _read_loop(self) -> None:
+        while True:
+            if not self._pubsub.subscribed:
+                await asyncio.sleep(0.05)
+                continue
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except Exception:
+                logger.exception("Redis pub/sub read failed")
+                await asyncio.sleep(1.0)
+                continue
+            if message and message["type"] == "message":
+                self._deliver_batch(message["channel"].decode(), message["data"])
+
+class LocalSocketBroker:
+    """Relays batches between processes on one host over a unix socket (for tests and dev)"""
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.pubsub_socket_path
+        self._channels: Dict[str, Set[asyncio.StreamWriter]] = defaultdict(set)
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.path, limit=STREAM_LIMIT
+        )
+    
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            for writers in self._channels.values():
+                for writer in writers:
+                    writer.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: Set[str] = set()
+        try:
+            async for line in reader:
+                request = json.loads(line)
+                channel = request["channel"]
+                if request["op"] == "sub":
+                    subscribed.add(channel)
+                    self._channels[channel].add(writer)
+                elif request["op"] == "unsub":
+                    subscribed.discard(channel)
+                    self._channels[channel].discard(writer)
+                elif request["op"] == "pub":
+                    frame = (json.dumps({"channel": channel, "messages": request["messages"]}) + "\n").encode()
+                    for subscriber in list(self._channels.get(channel, ())):
+                        subscriber.write(frame)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self._channels[channel].discard(writer)
+            writer.close()
+
+class LocalSocketPubSub(BatchingPubSub):
+    """Client of a LocalSocketBroker"""
+    
+    def __init__(self, path: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or settings.pubsub_socket_path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(
+            self.path, limit=STREAM_LIMIT
+        )
+        self._read_task = asyncio.create_task(self._read_loop())
+        await super().start()
+    
+    async def close(self) -> None:
+        await super().close()
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+    
+    async def _request(self, request: dict) -> None:
+        self._writer.write((json.dumps(request) + "\n").encode())
+        await self._writer.drain()
+    
+    async def _subscribe(self, channel: str) -> None:
+        await self._request({"op": "sub", "channel": channel})
+    
+    async def _unsubscribe(self, channel: str) -> None:
+        await self._request({"op": "unsub", "channel": channel})
+    
+    async def _send(self, batch: Dict[str, List[dict]]) -> None:
+        for channel, messages in batch.items():
+            self._writer.write((json.dumps({"op": "pub", "channel": channel, "messages": messages}) + "\n").encode())
+        await self._writer.drain()
+    
+    async def _read_loop(self) -> None:
+        async for line in self._reader:
+            frame = json.loads(line)
+            for message in frame["messages"]:
+                self._deliver(frame["channel"], message)
+
+def create_pubsub() -> PubSub:
+    """Build the backend selected by settings.pubsub_backend"""
+    if settings.pubsub_backend == "redis":
+        return RedisPubSub(settings.redis_url)
+    if settings.pubsub_backend == "local":
+        return LocalSocketPubSub()
+    return InProcessPubSub()
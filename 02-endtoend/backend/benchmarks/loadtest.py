@@ -0,0 +1,307 @@
+"""
+End-to-end interview load test
+
+Virtual users are started evenly over --ramp seconds. Each one then runs
+interview sessions back to back until --duration is up: register, log in,
+list problems, create an interview, join its room over WebSocket, run code
+and chat --runs times, then submit a solution. Per-step throughput, error
+counts and latency percentiles are printed as JSON.
+
+    python -m benchmarks.loadtest --serve --users 50 --ramp 10 --duration 60
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --output results.json
+
+--serve starts a local server on a throwaway SQLite database with rate
+limiting off and the per-IP login concurrency cap raised to --users (one
+client IP would otherwise hit both); against another server, relax those
+there first.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+import httpx
+
+try:
+    import websockets
+except ImportError:  # sessions skip the room traffic without it
+    websockets = None
+
+PROGRAM = "print(sum(range(1000)))"
+
+PROBLEM = {
+    "title": "Sum to N",
+    "description": "Print the sum of 0..999",
+    "difficulty": "easy",
+    "tags": ["loadtest"],
+    "sample_input": "",
+    "sample_output": "499500",
+    "test_cases": [{"input": "", "output": "499500", "hidden": False}],
+}
+
+class StepFailed(Exception):
+    pass
+
+class Stats:
+    """Latencies and errors per step"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.sessions = 0
+
+    def record(self, step: str, elapsed: float, error: Optional[str] = None) -> None:
+        if error is None:
+            self.latencies[step].append(elapsed)
+        else:
+            self.errors[step][error] += 1
+
+    def report(self, elapsed: float) -> dict:
+        steps = {}
+        for step in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies[step])
+            errors = sum(self.errors[step].values())
+            total = len(latencies) + errors
+            steps[step] = {
+                "requests": total,
+                "errors": errors,
+                "error_rate": round(errors / total, 4) if total else 0.0,
+                "error_kinds": dict(self.errors[step]),
+                "throughput_per_second": round(len(latencies) / elapsed, 2),
+                "latency_ms": {
+                    "mean": _ms(sum(latencies) / len(latencies)) if latencies else None,
+                    "p50": _ms(_percentile(latencies, 50)),
+                    "p90": _ms(_percentile(latencies, 90)),
+                    "p99": _ms(_percentile(latencies, 99)),
+                    "max": _ms(latencies[-1]) if latencies else None,
+                },
+            }
+        return {"elapsed_seconds": round(elapsed, 2), "sessions_completed": self.sessions, "steps": steps}
+
+def _percentile(ordered: List[float], percent: float) -> Optional[float]:
+    if not ordered:
+        return None
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 2)
+
+class VirtualUser:
+    """One simulated interviewer running sessions until the deadline"""
+
+    def __init__(self, client: httpx.AsyncClient, ws_url: Optional[str], stats: Stats, args, candidate_id: int):
+        self.client = client
+        self.ws_url = ws_url
+        self.candidate_id = candidate_id
+        self.stats = stats
+        self.args = args
+        self.headers: Dict[str, str] = {}
+
+    async def step(self, name: str, method: str, path: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=self.headers, **kwargs)
+        except httpx.HTTPError as exc:
+            self.stats.record(name, 0, type(exc).__name__)
+            raise StepFailed(name) from exc
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.stats.record(name, elapsed, str(response.status_code))
+            raise StepFailed(name)
+        self.stats.record(name, elapsed)
+        return response
+
+    async def run(self, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            try:
+                await self.session(deadline)
+                self.stats.sessions += 1
+            except StepFailed:
+                await asyncio.sleep(self.args.think)
+
+    async def session(self, deadline: float) -> None:
+        email = f"vu-{uuid.uuid4().hex[:12]}@loadtest.example"
+        password = "loadtest-password"
+        self.headers = {}
+        await self.step("register", "POST", "/api/auth/register", json={
+            "email": email, "username": email.split("@")[0], "full_name": "Load Test", "password": password,
+        })
+        token = (await self.step("login", "POST", "/api/auth/login", json={
+            "email": email, "password": password,
+        })).json()["access_token"]
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+        problems = (await self.step("list_problems", "GET", "/api/problems/", params={"limit": 20})).json()
+        problem_id = problems[0]["id"]
+        interview = (await self.step("create_interview", "POST", "/api/interviews/", json={
+            "problem_id": problem_id,
+            "candidate_id": self.candidate_id,
+            "scheduled_at": datetime.utcnow().isoformat(),
+        })).json()
+        interview_id = interview["id"]
+
+        socket = await self.join_room(interview_id, token)
+        try:
+            for _ in range(self.args.runs):
+                if time.monotonic() >= deadline:
+                    break
+                await self.step("execute", "POST", f"/api/interviews/{interview_id}/execute", json={
+                    "code": PROGRAM, "language": "python",
+                })
+                if socket is not None:
+                    await self.room_round_trip(socket)
+                await asyncio.sleep(self.args.think)
+            await self.step("submit", "POST", f"/api/interviews/{interview_id}/solutions", json={
+                "problem_id": problem_id, "code": PROGRAM, "language": "python",
+            })
+        finally:
+            if socket is not None:
+                await socket.close()
+
+    async def join_room(self, interview_id: int, token: str):
+        if self.ws_url is None:
+            return None
+        started = time.perf_counter()
+        try:
+            socket = await websockets.connect(f"{self.ws_url}/ws/interviews/{interview_id}?token={token}")
+        except (OSError, websockets.WebSocketException) as exc:
+            self.stats.record("ws_join", 0, type(exc).__name__)
+            raise StepFailed("ws_join") from exc
+        self.stats.record("ws_join", time.perf_counter() - started)
+        return socket
+
+    async def room_round_trip(self, socket) -> None:
+        """Edit the code, then time a chat message until the room echoes it back"""
+        marker = uuid.uuid4().hex
+        await socket.send(json.dumps({"event": "code-update", "data": {"code": f"# {marker}\n{PROGRAM}"}}))
+        started = time.perf_counter()
+        await socket.send(json.dumps({"event": "chat-message", "data": {"message": marker}}))
+
+        async def echoed():
+            while True:
+                frame = json.loads(await socket.recv())
+                if frame.get("event") == "new-chat-message" and frame["data"].get("message") == marker:
+                    return
+
+        try:
+            await asyncio.wait_for(echoed(), self.args.ws_timeout)
+        except (asyncio.TimeoutError, websockets.WebSocketException) as exc:
+            self.stats.record("ws_chat", 0, type(exc).__name__)
+            raise StepFailed("ws_chat") from exc
+        self.stats.record("ws_chat", time.perf_counter() - started)
+
+async def setup(client: httpx.AsyncClient) -> int:
+    """Register the candidate every session invites and create the problem unless one exists
+
+    Returns the candidate's user id.
+    """
+    email = f"candidate-{uuid.uuid4().hex[:12]}@loadtest.example"
+    user = {"email": email, "username": email.split("@")[0], "full_name": "Candidate", "password": "loadtest-password"}
+    registered = await client.post("/api/auth/register", json=user)
+    registered.raise_for_status()
+    if not (await client.get("/api/problems/", params={"limit": 1})).json():
+        login = await client.post("/api/auth/login", json={"email": email, "password": user["password"]})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        (await client.post("/api/problems/", json=PROBLEM, headers=headers)).raise_for_status()
+    return registered.json()["id"]
+
+async def run(args) -> dict:
+    stats = Stats()
+    ws_url = None
+    if args.websocket and websockets is not None:
+        ws_url = args.base_url.replace("http://", "ws://", 1).replace("https://", "wss://", 1)
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        candidate_id = await setup(client)
+        started = time.monotonic()
+        deadline = started + args.duration
+
+        async def start_user(index: int) -> None:
+            await asyncio.sleep(index * args.ramp / args.users)
+            await VirtualUser(client, ws_url, stats, args, candidate_id).run(deadline)
+
+        await asyncio.gather(*(start_user(i) for i in range(args.users)))
+        elapsed = time.monotonic() - started
+    report = stats.report(elapsed)
+    report["config"] = {
+        "base_url": args.base_url,
+        "users": args.users,
+        "ramp_seconds": args.ramp,
+        "duration_seconds": args.duration,
+        "runs_per_session": args.runs,
+        "think_seconds": args.think,
+        "websocket": ws_url is not None,
+    }
+    return report
+
+def serve(port: int, workdir: str, users: int) -> subprocess.Popen:
+    """Start the backend on SQLite and wait until it answers /health"""
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        BLOB_STORE_PATH=os.path.join(workdir, "blobs"),
+        RATE_LIMIT_ENABLED="false",
+        LOGIN_MAX_CONCURRENT=str(users),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:create_app", "--factory",
+         "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("server did not start within 30s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="start a local SQLite-backed server")
+    parser.add_argument("--port", type=int, default=8765, help="port for --serve")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds to start all users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run, including ramp")
+    parser.add_argument("--runs", type=int, default=5, help="code runs per session")
+    parser.add_argument("--think", type=float, default=0.5, help="seconds between actions")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout in seconds")
+    parser.add_argument("--ws-timeout", type=float, default=5.0, help="seconds to wait for a room echo")
+    parser.add_argument("--no-websocket", dest="websocket", action="store_false")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.serve:
+            args.base_url = f"http://127.0.0.1:{args.port}"
+            server = serve(args.port, workdir, args.users)
+        try:
+            report = asyncio.run(run(args))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Sustained login throughput benchmark
+
+Drives password verification through the hashing pool from many threads,
+the way concurrent /auth/login requests do, and reports logins per second.
+
+    python -m benchmarks.login_throughput --threads 32 --seconds 10
+"""
+
+import argparse
+import threading
+import time
+from app.core.config import settings
+from app.core.security import get_hash_pool, get_password_hash, verify_password, shutdown_hash_pool
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    hashed = get_password_hash("correct horse battery staple")
+    done = 0
+    done_lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            assert verify_password("correct horse battery staple", hashed)
+            with done_lock:
+                done += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"bcrypt rounds:    {settings.bcrypt_rounds}")
+    print(f"pool workers:     {get_hash_pool()._max_workers}")
+    print(f"client threads:   {args.threads}")
+    print(f"logins:           {done} in {elapsed:.1f}s")
+    print(f"logins/second:    {done / elapsed:.1f}")
+    shutdown_hash_pool()
+
+if __name__ == "__main__":
+    main()
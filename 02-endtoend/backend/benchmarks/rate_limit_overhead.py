@@ -0,0 +1,65 @@
+"""
+Rate limiter overhead benchmark
+
+Calls a no-op ASGI app directly and through RateLimitMiddleware, for an
+unlimited route and a limited one, and reports the added cost per request.
+
+    python -m benchmarks.rate_limit_overhead --requests 200000
+"""
+
+import argparse
+import asyncio
+import time
+from app.core.rate_limit import RateLimitMiddleware, RateLimitPolicy
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+def make_scope(method: str, path: str) -> dict:
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+    }
+
+async def measure(app, scope: dict, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+async def run(requests: int):
+    # Huge capacity so the limited route never actually rejects
+    limited = RateLimitMiddleware(noop_app, policies=[
+        RateLimitPolicy("login", "POST", r"^/api/auth/login/?$", f"{requests * 2}/second"),
+        RateLimitPolicy("register", "POST", r"^/api/auth/register/?$", f"{requests * 2}/second"),
+        RateLimitPolicy("execute", "POST", r"^/api/interviews/\d+/execute/?$", f"{requests * 2}/second"),
+    ])
+    unlimited_scope = make_scope("GET", "/api/problems/")
+    limited_scope = make_scope("POST", "/api/auth/login")
+
+    baseline = await measure(noop_app, unlimited_scope, requests)
+    unlimited = await measure(limited, unlimited_scope, requests)
+    limited_cost = await measure(limited, limited_scope, requests)
+
+    print(f"no middleware:        {baseline:.2f} us/request")
+    print(f"unlimited route:      {unlimited:.2f} us/request (+{unlimited - baseline:.2f})")
+    print(f"limited route:        {limited_cost:.2f} us/request (+{limited_cost - baseline:.2f})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+List response serialization benchmark
+
+Compares FastAPI's default path for a list endpoint (response_model
+validation, jsonable_encoder, stdlib json) with the pre-built RowSerializer
+plus orjson, on ORM-like rows.
+
+    python -m benchmarks.serialization --rows 500 --repeat 200
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.models import InterviewStatus
+from app.schemas import InterviewResponse, interview_list_serializer
+
+def make_rows(count: int):
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=i,
+            interviewer_id=1,
+            candidate_id=2,
+            problem_id=i % 50,
+            status=InterviewStatus.SCHEDULED,
+            scheduled_at=now,
+            started_at=None,
+            ended_at=None,
+            feedback="Solid problem solving, clear communication." if i % 3 else None,
+            rating=4,
+            created_at=now,
+        )
+        for i in range(count)
+    ]
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(List[InterviewResponse])
+
+    def default_path():
+        validated = adapter.validate_python(rows, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def fast_path():
+        return orjson.dumps(interview_list_serializer.many(rows))
+
+    assert json.loads(default_path()) == json.loads(fast_path())
+    baseline = timed(default_path, args.repeat)
+    fast = timed(fast_path, args.repeat)
+    print(f"rows per response:    {args.rows}")
+    print(f"validate + encoder:   {baseline:.3f} ms")
+    print(f"RowSerializer+orjson: {fast:.3f} ms ({baseline / fast:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
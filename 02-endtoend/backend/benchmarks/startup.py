@@ -0,0 +1,81 @@
+"""
+Cold-start benchmark
+
+Reports the slowest imports (from `python -X importtime`) when building the
+app, and the time from interpreter start to the first /health response.
+
+    python -m benchmarks.startup --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+BUILD_APP = "import app.main as m; m.create_app()"
+
+FIRST_REQUEST = """
+from fastapi.testclient import TestClient
+from app.main import create_app
+with TestClient(create_app()) as client:
+    assert client.get("/health").status_code == 200
+"""
+
+def _env(tmpdir: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{tmpdir}/startup.db")
+    env.setdefault("BLOB_STORE_PATH", f"{tmpdir}/blobs")
+    return env
+
+def import_times(top: int = 15) -> Tuple[float, List[Tuple[float, str]]]:
+    """Total import time and the slowest top-level packages, in ms"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BUILD_APP],
+            cwd=BACKEND_DIR, env=_env(tmpdir), capture_output=True, text=True, check=True,
+        )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip() == "cumulative":
+            continue
+        # Nested imports are indented under the module that triggered them
+        if len(name) - len(name.lstrip()) != 1:
+            continue
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(cumulative) / 1000
+    total = sum(packages.values())
+    slowest = sorted(((ms, name) for name, ms in packages.items()), reverse=True)[:top]
+    return total, slowest
+
+def time_to_first_request() -> float:
+    """Seconds from launching the interpreter to the first /health response"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", FIRST_REQUEST],
+            cwd=BACKEND_DIR, env=_env(tmpdir), check=True,
+        )
+        return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    total, slowest = import_times(args.top)
+    print(f"top-level imports: {total:.1f} ms")
+    for ms, name in slowest:
+        print(f"  {ms:8.1f} ms  {name}")
+    print(f"time to first request: {time_to_first_request() * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.config import configure, settings
+from app.core.database import Base, get_db
+from app.core.security import create_access_token
+from app.models import Interview, InterviewStatus, Problem, User, UserRole
+
+INTERVIEWER, CANDIDATE, OUTSIDER = 1, 2, 3
+
+@pytest.fixture
+def session_factory():
+    """In-memory database with three users, a problem and an interview between users 1 and 2"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    for user_id, role in ((INTERVIEWER, UserRole.INTERVIEWER), (CANDIDATE, UserRole.CANDIDATE), (OUTSIDER, UserRole.CANDIDATE)):
+        db.add(User(
+            id=user_id, email=f"user{user_id}@example.com", username=f"user{user_id}",
+            full_name=f"User {user_id}", hashed_password="-", role=role, is_active=True,
+        ))
+    db.add(Problem(
+        id=1, title="Add", description="Add two numbers", difficulty="easy",
+        test_cases=[
+            {"input": "1 2", "output": "3", "hidden": False},
+            {"input": "20 22", "output": "42", "hidden": True},
+        ],
+    ))
+    db.add(Interview(
+        id=1, interviewer_id=INTERVIEWER, candidate_id=CANDIDATE, problem_id=1,
+        status=InterviewStatus.ONGOING, scheduled_at=datetime.utcnow(),
+    ))
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+@pytest.fixture
+def api(session_factory):
+    """Client for the API routes (no middleware or lifespan), with a login() helper"""
+    from app.routes import interviews_router, problems_router
+    
+    app = FastAPI()
+    app.include_router(problems_router, prefix="/api")
+    app.include_router(interviews_router, prefix="/api")
+    
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app.dependency_overrides[get_db] = get_test_db
+    # Drop cached users, participants and snapshot heads from earlier tests
+    configure(settings)
+    client = TestClient(app)
+    
+    def login(user_id: int) -> None:
+        client.headers["Authorization"] = f"Bearer {create_access_token({'sub': str(user_id)})}"
+    
+    client.login = login
+    return client
@@ -0,0 +1,88 @@
+import sys
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.models import Problem
+from app.routes.problems import get_test_case_payload
+from app.schemas import CodeExecutionRequest, ProblemCreate
+from app.services.blob_store import BlobStore
+from app.services.code_executor import CodeExecutionService
+from app.services.services import ProblemService
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> BlobStore:
+    store = BlobStore(tmp_path / "blobs")
+    # The executor, services and routes share the module-level store
+    for module in ("app.services.code_executor", "app.services.services", "app.routes.problems"):
+        monkeypatch.setattr(sys.modules[module], "blob_store", store)
+    return store
+
+def test_same_content_is_stored_once(store):
+    ref = store.put("1 2\n")
+    assert store.put(b"1 2\n") == ref
+    assert store.path_for(ref) == store.root / ref[:2] / ref[2:]
+    assert [path for path in store.root.rglob("*") if path.is_file()] == [store.path_for(ref)]
+
+@pytest.mark.parametrize("ref", ["", "../../etc/passwd", "A" * 64, "a" * 63, "g" * 64])
+def test_path_for_rejects_bad_refs(store, ref):
+    with pytest.raises(ValueError):
+        store.path_for(ref)
+
+@pytest.mark.parametrize("data, expected", [
+    (b"42", True),
+    (b"  42\n\n", True),
+    (b"4 2", False),
+    (b"", False),
+])
+def test_matches_ignores_surrounding_whitespace(store, data, expected):
+    assert store.matches(store.put("42\n"), data) is expected
+
+def test_matches_compares_in_chunks(store, monkeypatch):
+    monkeypatch.setattr(BlobStore, "CHUNK_SIZE", 4)
+    ref = store.put("0123456789\n")
+    assert store.matches(ref, b"0123456789")
+    assert not store.matches(ref, b"0123456780")
+    assert store.matches(store.put(""), b"\n")
+
+def test_read_head_drops_a_split_character(store):
+    assert store.read_head(store.put("héllo"), 3) == "hél"
+
+def test_executor_feeds_blob_to_stdin(store):
+    ref = store.put("3 4\n")
+    result = CodeExecutionService.execute_code(
+        CodeExecutionRequest(code="a, b = map(int, input().split())\nprint(a * b)\n", language="python", input_data="0 0"),
+        input_ref=ref,
+    )
+    assert result.success and result.output.strip() == "12"
+
+def test_visible_payloads_stay_inline_and_downloadable(store, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.test_case_inline_limit", 8)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    problem = ProblemService.create_problem(db, ProblemCreate(
+        title="Add", description="Add two numbers", difficulty="easy",
+        sample_input="1 2", sample_output="3",
+        test_cases=[
+            {"input": "1 2", "output": "3", "hidden": False},
+            {"input": "9" * 100, "output": "1", "hidden": False},
+            {"input": "20 22", "output": "42", "hidden": True},
+        ],
+    ))
+    small, large, hidden = problem.test_cases
+    assert (small["input"], small["output"]) == ("1 2", "3")
+    assert "input" not in large and large["output"] == "1"
+    assert "input" not in hidden and "output" not in hidden
+    assert problem.public_test_cases[2] == {"hidden": True}
+    
+    response = get_test_case_payload(problem.id, 1, "input", db=db)
+    assert open(response.path).read() == "9" * 100
+    for index in (2, 3, -1):
+        with pytest.raises(HTTPException) as error:
+            get_test_case_payload(problem.id, index, "input", db=db)
+        assert error.value.status_code == 404
+    db.close()
+    engine.dispose()
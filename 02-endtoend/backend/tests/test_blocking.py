@@ -0,0 +1,48 @@
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.core.blocking import assert_no_blocking
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/blocking")
+    async def blocking():
+        time.sleep(0.2)
+        return {}
+    
+    @app.get("/awaiting")
+    async def awaiting():
+        await asyncio.sleep(0.2)
+        return {}
+    
+    @app.get("/threaded")
+    def threaded():
+        # Sync routes run in the threadpool, so sleeping here is fine
+        time.sleep(0.2)
+        return {}
+    
+    return app
+
+async def get(app: FastAPI, path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+def test_blocking_route_fails_with_its_call_site():
+    async def scenario():
+        with pytest.raises(AssertionError, match="in blocking"):
+            async with assert_no_blocking(threshold=0.05):
+                await get(make_app(), "/blocking")
+    
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("path", ["/awaiting", "/threaded"])
+def test_non_blocking_routes_pass(path):
+    async def scenario():
+        async with assert_no_blocking(threshold=0.05):
+            assert (await get(make_app(), path)).status_code == 200
+    
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+import zlib
+import pytest
+from app.core.compression import CompressionMiddleware, _accepted
+
+BIG = b'{"items":[' + b",".join(b'{"id":%d,"title":"problem"}' % i for i in range(200)) + b"]}"
+
+def response_app(body: bytes, content_type: bytes = b"application/json", extra_headers=()):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode()), *extra_headers],
+        })
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+def streaming_app(chunks):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+def call(app, accept_encoding: str = "gzip, deflate"):
+    middleware = CompressionMiddleware(
+        app, minimum_size=500, content_types=["application/json", "application/x-ndjson"],
+    )
+    sent = []
+    
+    async def send(message):
+        sent.append(message)
+    
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(middleware(scope, None, send))
+    return dict(sent[0]["headers"]), [message["body"] for message in sent[1:]]
+
+@pytest.mark.parametrize("header, expected", [
+    (b"gzip", True),
+    (b"deflate, GZIP;q=0.5", True),
+    (b"gzip;q=0", False),
+    (b"br", False),
+    (b"*", True),
+    (b"", False),
+])
+def test_accepted(header, expected):
+    assert _accepted(header, b"gzip") is expected
+
+def test_large_json_is_gzipped():
+    headers, bodies = call(response_app(BIG))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert int(headers[b"content-length"]) == len(bodies[0]) < len(BIG)
+    assert gzip.decompress(bodies[0]) == BIG
+
+@pytest.mark.parametrize("app, accept, encoding", [
+    (response_app(b'{"ok":true}'), "gzip", None),  # below minimum_size
+    (response_app(BIG), "gzip;q=0", None),
+    (response_app(BIG, content_type=b"image/png"), "gzip", None),
+    (response_app(BIG, extra_headers=[(b"content-encoding", b"br")]), "gzip", b"br"),  # precompressed
+])
+def test_bodies_sent_as_is(app, accept, encoding):
+    headers, bodies = call(app, accept)
+    assert headers.get(b"content-encoding") == encoding
+    assert b"".join(bodies) in (b'{"ok":true}', BIG)
+
+def test_streamed_chunks_decompress_as_they_arrive():
+    chunks = [b'{"id":%d}\n' % i * 20 for i in range(5)]
+    headers, bodies = call(streaming_app(chunks))
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    # Each chunk is sync-flushed, so a client can decode it without waiting for the end
+    for chunk, body in zip(chunks, bodies):
+        assert decoder.decompress(body) == chunk
+    decoder.decompress(bodies[-1])
+    assert decoder.eof
@@ -0,0 +1,24 @@
+import pytest
+from app.core.config import Settings, configure, settings
+from app.core.dependencies import get_user_cache
+from app.core.security import get_login_guard, get_token_cache
+from app.services.message_ingestion import MessageIngestionService
+
+@pytest.fixture
+def restore_settings():
+    original = settings.model_copy()
+    yield
+    configure(original)
+
+def test_configure_rebuilds_objects_derived_from_settings(restore_settings):
+    get_login_guard(), get_token_cache(), get_user_cache()
+    configure(Settings(login_max_concurrent=2, token_cache_size=7, user_cache_size=9, user_cache_ttl=1.5))
+    assert get_login_guard().limit == 2
+    assert get_token_cache().maxsize == 7
+    assert get_user_cache().maxsize == 9
+    assert get_user_cache().ttl == 1.5
+
+def test_shared_services_read_settings_lazily(restore_settings):
+    ingestion = MessageIngestionService()
+    configure(Settings(message_batch_size=3))
+    assert ingestion.batch_size == 3
@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
+from app.core import database
+
+@pytest.fixture
+def restore_engine():
+    engine, bind = database.engine, database.SessionLocal.kw.get("bind")
+    yield
+    database.engine = engine
+    database.SessionLocal.configure(bind=bind)
+
+def test_file_database_gets_a_connection_per_thread(tmp_path, restore_engine):
+    engine = database.init_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    assert not isinstance(engine.pool, StaticPool)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 30000
+    engine.dispose()
+
+@pytest.mark.parametrize("url", ["sqlite://", "sqlite:///:memory:"])
+def test_memory_database_is_shared(url, restore_engine):
+    engine = database.init_engine(url)
+    assert isinstance(engine.pool, StaticPool)
+    engine.dispose()
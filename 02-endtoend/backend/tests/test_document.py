@@ -0,0 +1,84 @@
+import random
+import pytest
+from app.websocket.document import (
+    OperationError,
+    SharedDocument,
+    apply,
+    replace_all,
+    transform,
+    validate,
+)
+
+def random_op(rng: random.Random, text: str) -> list:
+    """Random edit of text built from retains, deletes and inserts"""
+    ops = []
+    index = 0
+    while index < len(text):
+        n = rng.randint(1, len(text) - index)
+        kind = rng.choice("rdi")
+        if kind == "r":
+            ops.append(n)
+            index += n
+        elif kind == "d":
+            ops.append(-n)
+            index += n
+        else:
+            ops.append("".join(rng.choice("xyz\n") for _ in range(rng.randint(1, 4))))
+    if rng.random() < 0.5:
+        ops.append("end")
+    return ops
+
+def test_apply():
+    assert apply("hello world", [6, "big ", 5]) == "hello big world"
+    assert apply("hello world", [5, -6]) == "hello"
+    with pytest.raises(OperationError):
+        apply("short", [10])
+
+def test_validate_rejects_bad_components():
+    for bad in ("text", [0], [""], [True], [1.5]):
+        with pytest.raises(OperationError):
+            validate(bad)
+
+def test_transform_converges_on_random_edits():
+    rng = random.Random(1234)
+    for _ in range(500):
+        text = "".join(rng.choice("abcdef") for _ in range(rng.randint(0, 20)))
+        a, b = random_op(rng, text), random_op(rng, text)
+        a_prime, b_prime = transform(a, b)
+        assert apply(apply(text, a), b_prime) == apply(apply(text, b), a_prime)
+
+def test_concurrent_inserts_at_same_position_are_ordered():
+    a_prime, b_prime = transform([2, "A"], [2, "B"])
+    assert apply(apply("ab", [2, "A"]), b_prime) == "abAB"
+    assert apply(apply("ab", [2, "B"]), a_prime) == "abAB"
+
+def test_shared_document_rebases_stale_client_ops():
+    doc = SharedDocument("def f():\n    pass\n", history=10)
+    # Two clients edit version 0 at the same time
+    doc.apply_client_op(0, [4, -1, "g", 13])
+    doc.apply_client_op(0, [13, -4, "return 1", 1])
+    assert doc.text == "def g():\n    return 1\n"
+    assert doc.version == 2
+
+def test_shared_document_requires_resync_past_history():
+    doc = SharedDocument("", history=2)
+    for i in range(3):
+        doc.replace(str(i))
+    with pytest.raises(OperationError):
+        doc.apply_client_op(0, ["x"])
+    with pytest.raises(OperationError):
+        doc.apply_client_op(4, [1, "x"])
+
+def test_export_and_load_continue_identically():
+    doc = SharedDocument("abc", history=10)
+    doc.apply_client_op(0, [3, "d"])
+    other = SharedDocument(history=10)
+    other.load(doc.export())
+    for target in (doc, other):
+        target.apply_client_op(0, ["_", 3])
+    assert other.text == doc.text == "_abcd"
+    assert other.version == doc.version == 2
+    assert other.checksum == doc.checksum
+
+def test_replace_all():
+    assert apply("old", replace_all("old", "new")) == "new"
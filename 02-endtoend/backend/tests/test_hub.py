@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.websocket.hub import CollaborationHub, Connection, message_ingestion
+from app.websocket.pubsub import InProcessPubSub
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+    
+    async def send_json(self, frame: dict) -> None:
+        self.sent.append(frame)
+    
+    def events(self, name: str) -> list:
+        return [frame["data"] for frame in self.sent if frame["event"] == name]
+
+@pytest.fixture(autouse=True)
+def stored(monkeypatch) -> list:
+    """Messages handed to the ingestion service instead of the database"""
+    stored = []
+    monkeypatch.setattr(message_ingestion, "enqueue", lambda *args: stored.append(args))
+    return stored
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def open_room(hub: CollaborationHub, interview_id: int, *user_ids: int):
+    await hub.start()
+    sockets, connections = [], []
+    for user_id in user_ids:
+        socket = FakeSocket()
+        connection = Connection(socket, user_id)
+        room = await hub.join(interview_id, connection)
+        connection.offer(room.resume(None))
+        hub.dispatch(interview_id, {"type": "join", "userId": user_id, "connection": connection.id})
+        sockets.append(socket)
+        connections.append(connection)
+    await settle()
+    return room, sockets, connections
+
+def test_join_delta_ack_round_trip(stored):
+    async def scenario():
+        hub = CollaborationHub(InProcessPubSub())
+        room, (alice, bob), (conn_a, conn_b) = await open_room(hub, 7, 1, 2)
+        assert alice.sent[0]["event"] == "room-snapshot"
+        assert alice.events("user-joined") == [{"userId": 2}]
+        assert hub.participants(7) == [1, 2]
+        
+        hub.dispatch(7, {"type": "code-delta", "version": 0, "ops": ["print(1)"], "userId": 1, "connection": conn_a.id})
+        await settle()
+        assert alice.events("code-ack") == [{"version": 1}]
+        assert alice.events("code-delta") == []
+        assert bob.events("code-delta") == [{"version": 1, "ops": ["print(1)"], "userId": 1}]
+        assert room.document.text == "print(1)"
+        assert stored[0][:2] == (7, 1) and stored[0][3] == "code_update"
+        
+        # Bob edited version 0 too: his op is rebased onto Alice's
+        hub.dispatch(7, {"type": "code-delta", "version": 0, "ops": ["# hi\n"], "userId": 2, "connection": conn_b.id})
+        await settle()
+        assert room.document.text == "# hi\nprint(1)"
+        assert bob.events("code-ack") == [{"version": 2}]
+        assert alice.events("code-delta") == [{"version": 2, "ops": ["# hi\n", 8], "userId": 2}]
+        
+        await hub.leave(7, conn_a)
+        await hub.leave(7, conn_b)
+        await hub.stop()
+    
+    asyncio.run(scenario())
+
+def test_stale_delta_gets_authoritative_state():
+    async def scenario():
+        hub = CollaborationHub(InProcessPubSub())
+        room, (alice,), (conn,) = await open_room(hub, 8, 1)
+        hub.dispatch(8, {"type": "code-delta", "version": 5, "ops": ["x"], "userId": 1, "connection": conn.id})
+        await settle()
+        assert alice.events("code-state") == [{"version": 0, "code": ""}]
+        assert room.document.version == 0
+        await hub.leave(8, conn)
+    
+    asyncio.run(scenario())
+
+def test_chat_reaches_everyone_and_is_stored(stored):
+    async def scenario():
+        hub = CollaborationHub(InProcessPubSub())
+        room, sockets, connections = await open_room(hub, 9, 1, 2)
+        hub.dispatch(9, {"type": "chat-message", "message": "hello", "userId": 2, "connection": connections[1].id})
+        await settle()
+        for socket in sockets:
+            assert socket.events("new-chat-message") == [{"message": "hello", "userId": 2}]
+        assert (9, 2, "hello", "chat") in stored
+        for connection in connections:
+            await hub.leave(9, connection)
+    
+    asyncio.run(scenario())
+
+def test_slow_connection_drops_superseded_frames_first():
+    async def scenario():
+        connection = Connection(FakeSocket(), 1, max_queue=3)
+        connection.offer({"event": "new-chat-message", "data": 1})
+        connection.offer({"event": "code-updated", "data": "a"}, coalesce_key="code")
+        connection.offer({"event": "code-updated", "data": "b"}, coalesce_key="code")
+        connection.offer({"event": "new-chat-message", "data": 2})
+        connection.offer({"event": "new-chat-message", "data": 3})
+        connection.offer({"event": "new-chat-message", "data": 4})
+        # Pending code frame was replaced, then dropped before any chat message
+        assert connection.dropped == 2
+        connection.start()
+        await settle()
+        assert [frame["data"] for frame in connection.websocket.sent] == [2, 3, 4]
+        await connection.close()
+    
+    asyncio.run(scenario())
+
+def test_resume_replays_missed_events_or_falls_back_to_snapshot(monkeypatch):
+    monkeypatch.setattr(settings, "ws_replay_buffer", 3)
+    
+    async def scenario():
+        hub = CollaborationHub(InProcessPubSub())
+        room, (alice,), (conn,) = await open_room(hub, 10, 1)
+        for text in ("a", "b", "c", "d"):
+            hub.dispatch(10, {"type": "chat-message", "message": text, "userId": 1, "connection": conn.id})
+        await settle()
+        assert room.seq == 5  # user-joined and four messages
+        
+        resumed = room.resume(3)
+        assert resumed["event"] == "room-resume"
+        assert [frame["data"]["message"] for frame in resumed["data"]["events"]] == ["c", "d"]
+        assert room.resume(5)["data"]["events"] == []
+        
+        # Events before the ring buffer are gone: a snapshot replaces them
+        snapshot = room.resume(1)
+        assert snapshot["event"] == "room-snapshot"
+        assert snapshot["data"]["seq"] == 5
+        assert [frame["data"]["message"] for frame in snapshot["data"]["chat"]] == ["a", "b", "c", "d"]
+        # A seq from the future (e.g. another room incarnation) also gets a snapshot
+        assert room.resume(99)["event"] == "room-snapshot"
+        await hub.leave(10, conn)
+    
+    asyncio.run(scenario())
+
+def test_empty_room_keeps_state_for_reconnects(monkeypatch):
+    monkeypatch.setattr(settings, "ws_room_idle_ttl", 0.05)
+    
+    async def scenario():
+        hub = CollaborationHub(InProcessPubSub())
+        room, _, (conn,) = await open_room(hub, 11, 1)
+        hub.dispatch(11, {"type": "code-update", "code": "x = 1", "userId": 1, "connection": conn.id})
+        await settle()
+        await hub.leave(11, conn)
+        
+        again = Connection(FakeSocket(), 1)
+        assert await hub.join(11, again) is room
+        assert room.resume(None)["data"]["code"] == "x = 1"
+        await hub.leave(11, again)
+        
+        await asyncio.sleep(0.1)
+        assert 11 not in hub.rooms
+    
+    asyncio.run(scenario())
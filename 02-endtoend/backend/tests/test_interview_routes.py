@@ -0,0 +1,70 @@
+import pytest
+from app.models import Solution
+from app.routes import interviews as interview_routes
+from tests.conftest import CANDIDATE, INTERVIEWER, OUTSIDER
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    monkeypatch.setattr(interview_routes.message_ingestion, "enqueue", lambda *args: calls.append(args))
+    return calls
+
+def test_participants_post_and_read_messages(api, enqueued):
+    api.login(CANDIDATE)
+    response = api.post("/api/interviews/1/messages", json={"content": "hi", "message_type": "chat"})
+    assert response.status_code == 202
+    assert enqueued == [(1, CANDIDATE, "hi", "chat")]
+    assert api.get("/api/interviews/1/messages").status_code == 200
+
+def test_clients_cannot_send_system_messages(api, enqueued):
+    api.login(INTERVIEWER)
+    response = api.post("/api/interviews/1/messages", json={"content": "x", "message_type": "system"})
+    assert response.status_code == 422
+    assert enqueued == []
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/api/interviews/1/messages"),
+    ("get", "/api/interviews/1/messages"),
+])
+def test_message_routes_require_participation(api, enqueued, method, path):
+    kwargs = {"json": {"content": "hi"}} if method == "post" else {}
+    assert getattr(api, method)(path, **kwargs).status_code == 401
+    api.login(OUTSIDER)
+    assert getattr(api, method)(path, **kwargs).status_code == 403
+    assert getattr(api, method)(path.replace("/1/", "/99/"), **kwargs).status_code == 404
+    assert enqueued == []
+
+def test_snapshots_record_and_replay(api):
+    api.login(CANDIDATE)
+    assert api.post("/api/interviews/1/snapshots", json={"code": "print(1)"}).status_code == 200
+    assert api.post("/api/interviews/1/snapshots", json={"code": "print(2)"}).status_code == 200
+    api.login(INTERVIEWER)
+    assert api.get(f"/api/interviews/1/snapshots/{CANDIDATE}/code").json()["code"] == "print(2)"
+    lines = api.get(f"/api/interviews/1/snapshots/{CANDIDATE}/replay").text.splitlines()
+    assert len(lines) == 2
+
+@pytest.mark.parametrize("method, path", [
+    ("post", "/api/interviews/1/snapshots"),
+    ("get", f"/api/interviews/1/snapshots/{CANDIDATE}/code"),
+    ("get", f"/api/interviews/1/snapshots/{CANDIDATE}/replay"),
+])
+def test_snapshot_routes_require_participation(api, method, path):
+    kwargs = {"json": {"code": "print(1)"}} if method == "post" else {}
+    assert getattr(api, method)(path, **kwargs).status_code == 401
+    api.login(OUTSIDER)
+    assert getattr(api, method)(path, **kwargs).status_code == 403
+
+def test_solutions_require_participation(api, session_factory):
+    db = session_factory()
+    solution = Solution(interview_id=1, problem_id=1, user_id=CANDIDATE, code="print(3)", language="python", status="queued")
+    db.add(solution)
+    db.commit()
+    solution_id = solution.id
+    db.close()
+    for path in ("/api/interviews/1/solutions", f"/api/interviews/1/solutions/{solution_id}"):
+        assert api.get(path).status_code == 401
+        api.login(OUTSIDER)
+        assert api.get(path).status_code == 403
+        api.login(INTERVIEWER)
+        assert api.get(path).status_code == 200
+        api.headers.pop("Authorization")
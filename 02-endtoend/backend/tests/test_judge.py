@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from app.models import ProblemStats, Solution
+from app.services.judge import QUEUED, RUNNING, JudgeService
+
+ADD = "a, b = map(int, input().split())\nprint(a + b)\n"
+
+def submit(session_factory, code: str, status: str = QUEUED, **fields) -> int:
+    db = session_factory()
+    solution = Solution(interview_id=1, problem_id=1, user_id=2, code=code, language="python", status=status, **fields)
+    db.add(solution)
+    db.commit()
+    solution_id = solution.id
+    db.close()
+    return solution_id
+
+def judged(session_factory):
+    notified = []
+    judge = JudgeService(workers=1, session_factory=session_factory)
+    judge.notify = lambda interview_id, result: notified.append((interview_id, result))
+    return judge, notified
+
+def test_accepted_and_pushed_to_the_room(session_factory):
+    judge, notified = judged(session_factory)
+    solution_id = submit(session_factory, ADD)
+    result = judge.judge(solution_id)
+    assert result["status"] == "accepted"
+    assert [entry["passed"] for entry in result["test_results"]] == [True, True]
+    assert notified == [(1, result)]
+    
+    db = session_factory()
+    solution = db.get(Solution, solution_id)
+    assert solution.status == "accepted" and solution.test_results == result["test_results"]
+    stats = db.query(ProblemStats).filter(ProblemStats.problem_id == 1).one()
+    assert stats.accepted == 1  # submissions are counted when the solution is created
+    db.close()
+    
+    # Judged once: a second delivery finds nothing to claim
+    assert judge.judge(solution_id) is None
+
+def test_wrong_answer_hides_hidden_test_output(session_factory):
+    judge, _ = judged(session_factory)
+    # Right on the visible test, wrong on the hidden one
+    result = judge.judge(submit(session_factory, "input()\nprint(3)\n"))
+    assert result["status"] == "wrong_answer"
+    visible, hidden = result["test_results"]
+    assert visible["passed"] and visible["output"].strip() == visible["expected"] == "3"
+    assert not hidden["passed"]
+    assert "output" not in hidden and "expected" not in hidden
+
+def test_hidden_test_stderr_is_not_returned(session_factory):
+    judge, _ = judged(session_factory)
+    # Passes the visible test, then echoes the hidden input to stderr
+    code = "import sys\ns = input()\nif s != '1 2':\n    sys.stderr.write(s)\n    sys.exit(1)\nprint(3)\n"
+    result = judge.judge(submit(session_factory, code))
+    assert result["status"] == "runtime_error"
+    visible, hidden = result["test_results"]
+    assert visible["passed"] and not hidden["passed"]
+    assert set(hidden) == {"test_case", "passed", "execution_time"}
+    assert "20 22" not in str(result)
+
+def test_runtime_error(session_factory):
+    judge, _ = judged(session_factory)
+    result = judge.judge(submit(session_factory, "raise SystemExit(1)\n"))
+    assert result["status"] == "runtime_error"
+    assert len(result["test_results"]) == 1  # stops at the first failure
+
+def test_stale_running_solutions_are_requeued(session_factory):
+    judge, _ = judged(session_factory)
+    stale = submit(session_factory, ADD, status=RUNNING, claimed_at=datetime.utcnow() - timedelta(hours=1))
+    busy = submit(session_factory, ADD, status=RUNNING, claimed_at=datetime.utcnow())
+    queued = submit(session_factory, ADD)
+    assert judge.requeue_queued() == 2
+    assert sorted([judge._queue.get_nowait(), judge._queue.get_nowait()]) == [stale, queued]
+    assert judge.judge(busy) is None
+    assert judge.judge(stale)["status"] == "accepted"
+
+def test_verdict_of_a_lost_claim_is_dropped(session_factory, monkeypatch):
+    judge, notified = judged(session_factory)
+    solution_id = submit(session_factory, ADD)
+    run_tests = judge._run_tests
+    
+    def slow_run(solution, problem):
+        outcome = run_tests(solution, problem)
+        # Meanwhile the claim went stale and another worker took the solution
+        db = session_factory()
+        db.query(Solution).filter(Solution.id == solution_id).update({Solution.claimed_at: datetime.utcnow()})
+        db.commit()
+        db.close()
+        return outcome
+    
+    monkeypatch.setattr(judge, "_run_tests", slow_run)
+    assert judge.judge(solution_id) is None
+    assert notified == []
+    db = session_factory()
+    assert db.get(Solution, solution_id).status == RUNNING
+    assert db.query(ProblemStats).count() == 0
+    db.close()
@@ -0,0 +1,49 @@
+import asyncio
+from app.core.load_shedding import CRITICAL, LOW, NORMAL, LoadShedder, LoadSheddingMiddleware
+
+def test_levels_rise_at_once_and_fall_with_hysteresis():
+    shedder = LoadShedder()
+    assert shedder.update(0.0, 0.95, 0) == 1  # threadpool past its threshold
+    assert shedder.update(0.0, 0.85, 0) == 1  # still above HYSTERESIS of the level
+    assert shedder.update(0.0, 0.5, 0) == 0
+    assert shedder.update(0.0, 0.0, 1000) == 2
+
+def test_admission_by_priority():
+    shedder = LoadShedder()
+    shedder.level = 1
+    assert [shedder.admits(p) for p in (CRITICAL, NORMAL, LOW)] == [True, True, False]
+    shedder.level = 2
+    assert [shedder.admits(p) for p in (CRITICAL, NORMAL, LOW)] == [True, False, False]
+
+def test_route_priorities():
+    middleware = LoadSheddingMiddleware(None, LoadShedder())
+    assert middleware.priority("GET", "/health/ready") == CRITICAL
+    assert middleware.priority("POST", "/api/auth/login") == CRITICAL
+    assert middleware.priority("POST", "/api/interviews/3/execute") == LOW
+    assert middleware.priority("GET", "/api/problems/") == LOW
+    assert middleware.priority("POST", "/api/interviews/3/messages") == CRITICAL
+    assert middleware.priority("POST", "/api/problems/") == NORMAL
+
+def test_shed_requests_get_503_with_retry_after():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    
+    shedder = LoadShedder()
+    shedder.level = 2
+    middleware = LoadSheddingMiddleware(app, shedder)
+    
+    def status(method: str, path: str):
+        sent = []
+        
+        async def send(message):
+            sent.append(message)
+        
+        asyncio.run(middleware({"type": "http", "method": method, "path": path}, None, send))
+        return sent[0]["status"], dict(sent[0]["headers"]).get(b"retry-after")
+    
+    assert status("GET", "/api/problems/")[0] == 503
+    assert status("POST", "/api/problems/")[0] == 503
+    assert status("GET", "/health")[0] == 200
+    code, retry_after = status("GET", "/api/interviews/user/4")
+    assert code == 503 and int(retry_after) > 0
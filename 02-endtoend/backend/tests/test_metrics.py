@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import httpx
+from fastapi import FastAPI
+from app.core.metrics import MetricsMiddleware, Registry, http_requests
+
+def test_counter_labels_are_escaped():
+    registry = Registry()
+    counter = registry.counter("jobs_total", "Jobs run", ("name",))
+    counter.labels('say "hi"\\\n').inc()
+    counter.labels("plain").inc(2.5)
+    assert registry.render() == (
+        "# HELP jobs_total Jobs run\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{name="say \\"hi\\"\\\\\\n"} 1\n'
+        'jobs_total{name="plain"} 2.5\n'
+    )
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.5, 0.1))
+    for value in (0.05, 0.1, 0.3, 7.0):
+        histogram.labels("/a").observe(value)
+    lines = registry.render().splitlines()
+    assert lines[1] == "# TYPE latency_seconds histogram"
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',  # a value on a bound counts in it
+        'latency_seconds_bucket{route="/a",le="0.5"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_count{route="/a"} 4',
+        'latency_seconds_sum{route="/a"} 7.45',
+    ]
+
+def test_threads_add_up_and_collectors_render():
+    registry = Registry()
+    gauge = registry.gauge("busy", "Busy workers")
+    registry.collector(lambda: [("pool_size", "gauge", "Pool size", [("pool_size", {}, 4)])])
+    
+    def work():
+        for _ in range(1000):
+            gauge.inc()
+        gauge.dec(500)
+    
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    rendered = registry.render()
+    assert "\nbusy 2000\n" in rendered
+    assert rendered.endswith("# TYPE pool_size gauge\npool_size 4\n")
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {}
+    
+    counter = http_requests.labels("GET", "/items/{item_id}", "200")
+    unmatched = http_requests.labels("GET", "unmatched", "404")
+    before, before_unmatched = counter.get(), unmatched.get()
+    
+    async def scenario():
+        transport = httpx.ASGITransport(app=MetricsMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/items/1")
+            await client.get("/items/2")
+            await client.get("/nowhere")
+    
+    asyncio.run(scenario())
+    assert counter.get() - before == 2
+    assert unmatched.get() - before_unmatched == 1
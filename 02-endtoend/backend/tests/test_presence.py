@@ -0,0 +1,49 @@
+import asyncio
+from app.websocket.presence import PresenceTracker
+
+def test_updates_between_ticks_are_coalesced():
+    async def scenario():
+        flushed = []
+        tracker = PresenceTracker(flushed.append, rate=20)
+        for column in range(10):
+            tracker.update(1, {"line": 1, "column": column})
+        tracker.update(2, {"line": 5, "column": 0})
+        await asyncio.sleep(tracker.interval * 1.5)
+        assert len(flushed) == 1
+        assert sorted(flushed[0], key=lambda state: state["userId"]) == [
+            {"userId": 1, "line": 1, "column": 9},
+            {"userId": 2, "line": 5, "column": 0},
+        ]
+        
+        # Only participants that moved are sent on the next tick
+        tracker.update(2, {"line": 6, "column": 0})
+        await asyncio.sleep(tracker.interval * 1.5)
+        assert flushed[1] == [{"userId": 2, "line": 6, "column": 0}]
+        
+        # Nothing moved: nothing is sent
+        await asyncio.sleep(tracker.interval * 3)
+        assert len(flushed) == 2
+        tracker.close()
+    
+    asyncio.run(scenario())
+
+def test_removed_participant_is_not_flushed():
+    flushed = []
+    tracker = PresenceTracker(flushed.append, rate=50)
+    tracker._states[1] = {"line": 1}
+    tracker._dirty.add(1)
+    tracker.remove(1)
+    tracker.flush()
+    assert flushed == []
+    assert tracker.snapshot() == []
+
+def test_ticker_stops_when_idle():
+    async def scenario():
+        tracker = PresenceTracker(lambda changed: None, rate=200)
+        tracker.update(1, {"line": 1})
+        assert tracker._task is not None
+        await asyncio.sleep(tracker.interval * tracker.IDLE_TICKS * 3)
+        assert tracker._task is None
+        assert tracker.snapshot() == [{"userId": 1, "line": 1}]
+    
+    asyncio.run(scenario())
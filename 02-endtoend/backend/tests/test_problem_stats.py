@@ -0,0 +1,105 @@
+import threading
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import Problem, ProblemStats, Solution
+from app.services.problem_stats import ProblemStatsService, histogram_median, runtime_bucket
+from app.services.services import SolutionService
+
+@pytest.mark.parametrize("seconds, bucket", [(0.0123, 12), (0.1234, 120), (2.345, 2300), (-1, 0)])
+def test_runtime_bucket_keeps_two_significant_digits(seconds, bucket):
+    assert runtime_bucket(seconds) == bucket
+
+@pytest.mark.parametrize("histogram, median", [
+    ({}, None),
+    ({"12": 1}, 0.012),
+    ({"12": 1, "9": 1, "300": 1}, 0.012),  # buckets sort numerically, not as strings
+    ({"10": 3, "20": 1}, 0.01),
+])
+def test_histogram_median(histogram, median):
+    assert histogram_median(histogram) == median
+
+def stats_for(db, problem_id: int = 1) -> ProblemStats:
+    return db.query(ProblemStats).filter(ProblemStats.problem_id == problem_id).populate_existing().one()
+
+def test_queued_then_accepted(session_factory):
+    db = session_factory()
+    solution = SolutionService.create_solution(db, {
+        "problem_id": 1, "user_id": 2, "code": "print(3)", "language": "python", "status": "queued",
+    })
+    stats = stats_for(db)
+    assert (stats.submissions, stats.accepted, stats.language_counts) == (1, 0, {"python": 1})
+    assert stats.runtime_histogram == {} and stats.median_runtime is None
+    
+    solution.status = "accepted"
+    solution.execution_time = 0.0123
+    ProblemStatsService.record_result(db, solution)
+    db.commit()
+    stats = stats_for(db)
+    assert (stats.submissions, stats.accepted) == (1, 1)
+    assert stats.runtime_histogram == {"12": 1} and stats.median_runtime == 0.012
+    
+    # Rebuilding from the solutions table gives the same numbers
+    before = (stats.submissions, stats.accepted, stats.language_counts, stats.runtime_histogram)
+    assert ProblemStatsService.rebuild_all(db) == 1
+    stats = stats_for(db)
+    assert (stats.submissions, stats.accepted, stats.language_counts, stats.runtime_histogram) == before
+    db.close()
+
+def test_wrong_answers_only_count_as_submissions(session_factory):
+    db = session_factory()
+    solution = SolutionService.create_solution(db, {
+        "problem_id": 1, "user_id": 2, "code": "print(4)", "language": "python", "status": "queued",
+    })
+    solution.status = "wrong_answer"
+    ProblemStatsService.record_result(db, solution)
+    db.commit()
+    stats = stats_for(db)
+    assert (stats.submissions, stats.accepted) == (1, 0)
+    db.close()
+
+def test_concurrent_first_submissions_are_all_counted(tmp_path):
+    # A file database, so each thread has its own connection and real locking
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}", connect_args={"timeout": 30})
+    
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(Problem(id=1, title="Add", description="", difficulty="easy", test_cases=[]))
+    db.commit()
+    db.close()
+    
+    threads, per_thread = 8, 5
+    start = threading.Barrier(threads)
+    errors = []
+    
+    def submit(language: str):
+        start.wait()
+        for _ in range(per_thread):
+            db = factory()
+            try:
+                ProblemStatsService.record_submission(
+                    db, Solution(problem_id=1, language=language, status="accepted", execution_time=0.01)
+                )
+                db.commit()
+            except Exception as exc:  # surfaced below
+                errors.append(exc)
+            finally:
+                db.close()
+    
+    workers = [threading.Thread(target=submit, args=(f"lang{i % 2}",)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    assert errors == []
+    db = factory()
+    stats = stats_for(db)
+    total = threads * per_thread
+    assert (stats.submissions, stats.accepted) == (total, total)
+    assert stats.language_counts == {"lang0": total // 2, "lang1": total // 2}
+    assert stats.runtime_histogram == {"10": total}
+    db.close()
+    engine.dispose()
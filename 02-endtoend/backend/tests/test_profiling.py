@@ -0,0 +1,55 @@
+import asyncio
+import json
+import time
+import httpx
+from fastapi import FastAPI
+from app.core.profiling import ProfilingMiddleware
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    
+    @app.get("/work/{n}")
+    def work(n: int):
+        # Busy in a threadpool worker long enough to be sampled
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"n": n}
+    
+    return app
+
+def call(tmp_path, headers=None, sample_rate=0.0):
+    middleware = ProfilingMiddleware(
+        make_app(), token="secret", sample_rate=sample_rate, interval=0.001, directory=str(tmp_path),
+    )
+    
+    async def scenario():
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/work/3", headers=headers or {})
+    
+    response = asyncio.run(scenario())
+    assert response.json() == {"n": 3}
+    return sorted(tmp_path.glob("*.speedscope.json"))
+
+def test_token_writes_a_speedscope_profile(tmp_path):
+    [path] = call(tmp_path, {"X-Profile": "secret"})
+    assert "-GET-work_n-" in path.name
+    profile = json.loads(path.read_text())
+    assert profile["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    assert profile["name"].startswith("GET /work/{n} (")
+    frames = profile["shared"]["frames"]
+    assert profile["profiles"]
+    for thread in profile["profiles"]:
+        assert thread["type"] == "sampled" and thread["unit"] == "seconds"
+        assert len(thread["samples"]) == len(thread["weights"]) > 0
+        assert all(0 <= index < len(frames) for stack in thread["samples"] for index in stack)
+    sampled = {frames[index]["name"] for thread in profile["profiles"] for stack in thread["samples"] for index in stack}
+    assert "work" in sampled
+
+def test_other_requests_are_not_profiled(tmp_path):
+    assert call(tmp_path) == []
+    assert call(tmp_path, {"X-Profile": "wrong"}) == []
+
+def test_sampled_requests_are_profiled(tmp_path):
+    assert len(call(tmp_path, sample_rate=1.0)) == 1
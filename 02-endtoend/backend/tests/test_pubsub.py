@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from app.websocket.hub import CollaborationHub, Connection, message_ingestion
+from app.websocket.pubsub import BatchingPubSub, InProcessPubSub, LocalSocketBroker, LocalSocketPubSub
+
+class RecordingPubSub(BatchingPubSub):
+    """Loops batches straight back, recording what was sent"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sent = []
+    
+    async def _send(self, batch):
+        self.sent.append(batch)
+        for channel, messages in batch.items():
+            for message in messages:
+                self._deliver(channel, message)
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+    
+    async def send_json(self, frame: dict) -> None:
+        self.sent.append(frame)
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def test_in_process_delivers_in_order_with_ref_counted_subscriptions():
+    async def scenario():
+        pubsub = InProcessPubSub()
+        first, second = [], []
+        await pubsub.subscribe("room", first.append)
+        await pubsub.subscribe("room", second.append)
+        for i in range(3):
+            pubsub.publish("room", {"n": i})
+        pubsub.publish("other", {"n": 99})
+        await asyncio.sleep(0)
+        assert first == second == [{"n": 0}, {"n": 1}, {"n": 2}]
+        
+        await pubsub.unsubscribe("room", first.append)
+        pubsub.publish("room", {"n": 3})
+        await asyncio.sleep(0)
+        assert len(first) == 3 and second[-1] == {"n": 3}
+        await pubsub.unsubscribe("room", second.append)
+        assert "room" not in pubsub._subscribers
+    
+    asyncio.run(scenario())
+
+def test_batching_flushes_on_size_and_interval():
+    async def scenario():
+        pubsub = RecordingPubSub(batch_size=3, batch_interval=0.02)
+        await pubsub.start()
+        received = []
+        await pubsub.subscribe("a", received.append)
+        for i in range(4):
+            pubsub.publish("a", {"n": i})
+        pubsub.publish("b", {"n": 10})
+        await asyncio.sleep(0)
+        # The third message filled a batch at once
+        assert pubsub.sent == [{"a": [{"n": 0}, {"n": 1}, {"n": 2}]}]
+        await wait_for(lambda: len(pubsub.sent) == 2)
+        assert pubsub.sent[1] == {"a": [{"n": 3}], "b": [{"n": 10}]}
+        assert received == [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}]
+        await pubsub.close()
+    
+    asyncio.run(scenario())
+
+@pytest.fixture
+def socket_path(tmp_path) -> str:
+    return str(tmp_path / "pubsub.sock")
+
+def test_local_socket_fans_out_between_clients(socket_path):
+    async def scenario():
+        broker = LocalSocketBroker(socket_path)
+        await broker.start()
+        one = LocalSocketPubSub(socket_path, batch_interval=0.001)
+        two = LocalSocketPubSub(socket_path, batch_interval=0.001)
+        await one.start()
+        await two.start()
+        got_one, got_two = [], []
+        await one.subscribe("room", got_one.append)
+        await two.subscribe("room", got_two.append)
+        await asyncio.sleep(0.05)
+        
+        one.publish("room", {"from": 1})
+        two.publish("room", {"from": 2})
+        await wait_for(lambda: len(got_one) == 2 and len(got_two) == 2)
+        # Publishers receive their own messages too
+        assert {m["from"] for m in got_one} == {m["from"] for m in got_two} == {1, 2}
+        
+        await one.close()
+        await two.close()
+        await broker.close()
+    
+    asyncio.run(scenario())
+
+def test_room_state_syncs_across_workers(socket_path, monkeypatch):
+    monkeypatch.setattr(message_ingestion, "enqueue", lambda *args: None)
+    
+    async def scenario():
+        broker = LocalSocketBroker(socket_path)
+        await broker.start()
+        worker_a = CollaborationHub(LocalSocketPubSub(socket_path, batch_interval=0.001))
+        worker_b = CollaborationHub(LocalSocketPubSub(socket_path, batch_interval=0.001))
+        await worker_a.start()
+        await worker_b.start()
+        
+        alice = Connection(FakeSocket(), 1)
+        room_a = await worker_a.join(5, alice)
+        worker_a.dispatch(5, {"type": "code-delta", "version": 0, "ops": ["x = 1"], "userId": 1, "connection": alice.id})
+        await wait_for(lambda: room_a.document.version == 1)
+        
+        # A worker opening the room later adopts its state from the peer
+        bob = Connection(FakeSocket(), 2)
+        room_b = await worker_b.join(5, bob)
+        assert room_b.document.text == "x = 1"
+        worker_b.dispatch(5, {"type": "code-delta", "version": 1, "ops": [5, "\ny = 2"], "userId": 2, "connection": bob.id})
+        await wait_for(lambda: room_a.document.version == room_b.document.version == 2)
+        assert room_a.document.text == room_b.document.text == "x = 1\ny = 2"
+        await wait_for(lambda: any(f["event"] == "code-delta" for f in alice.websocket.sent))
+        
+        await worker_a.leave(5, alice)
+        await worker_b.leave(5, bob)
+        await worker_a.stop()
+        await worker_b.stop()
+        await broker.close()
+    
+    asyncio.run(scenario())
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from app.core import rate_limit
+from app.core.rate_limit import InMemoryBucketStore, RateLimitMiddleware, RateLimitPolicy, parse_rate
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+def test_parse_rate():
+    assert parse_rate("10/minute") == (10, 60)
+    assert parse_rate("5 / Second") == (5, 1)
+
+def test_bucket_denies_when_empty_and_refills(clock):
+    store = InMemoryBucketStore()
+    policy = RateLimitPolicy("login", "POST", r"^/login$", "2/second")
+    
+    async def scenario():
+        assert (await store.take("a", policy))[0]
+        assert (await store.take("a", policy))[0]
+        allowed, remaining, wait = await store.take("a", policy)
+        assert not allowed
+        assert remaining == pytest.approx(0)
+        assert wait == pytest.approx(0.5)
+        # Other clients have their own bucket
+        assert (await store.take("b", policy))[0]
+        
+        clock.now += 0.5
+        assert (await store.take("a", policy))[0]
+        assert not (await store.take("a", policy))[0]
+        
+        # Refill stops at capacity
+        clock.now += 60
+        assert [(await store.take("a", policy))[0] for _ in range(3)] == [True, True, False]
+    
+    asyncio.run(scenario())
+
+def test_middleware_returns_429_with_retry_after(clock):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    
+    policy = RateLimitPolicy("login", "POST", r"^/api/auth/login$", "1/minute")
+    middleware = RateLimitMiddleware(app, policies=[policy], store=InMemoryBucketStore())
+    
+    async def call(method: str, path: str) -> dict:
+        sent = []
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {"type": "http", "method": method, "path": path, "headers": [], "client": ("10.0.0.1", 1)}
+        await middleware(scope, None, send)
+        start = sent[0]
+        return {"status": start["status"], "headers": dict(start["headers"])}
+    
+    async def scenario():
+        first = await call("POST", "/api/auth/login")
+        assert first["status"] == 200
+        assert first["headers"][b"ratelimit-limit"] == b"1"
+        denied = await call("POST", "/api/auth/login")
+        assert denied["status"] == 429
+        assert denied["headers"][b"retry-after"] == b"60"
+        # Routes without a policy are not limited
+        assert (await call("GET", "/api/auth/login"))["status"] == 200
+    
+    asyncio.run(scenario())
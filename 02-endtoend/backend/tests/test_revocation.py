@@ -0,0 +1,77 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.core.config import Settings, configure, settings
+from app.core.revocation import RevocationList
+from app.models import RevokedToken
+
+NOW = datetime.utcnow()
+LATER = NOW + timedelta(hours=1)
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    yield db
+    db.close()
+
+def add_row(db, jti: str, expires_at: datetime = LATER, revoked_at: datetime = NOW, row_id: int = None) -> None:
+    db.add(RevokedToken(id=row_id, jti=jti, expires_at=expires_at, revoked_at=revoked_at))
+    db.commit()
+
+def test_revoke_applies_at_once_and_persists(db):
+    revocations = RevocationList()
+    assert not revocations.is_revoked("a" * 32)
+    revocations.revoke(db, "a" * 32, LATER)
+    revocations.revoke(db, "a" * 32, LATER)  # a second revoke is harmless
+    assert revocations.is_revoked("a" * 32)
+    assert not revocations.is_revoked("b" * 32)
+    assert not revocations.is_revoked(None)
+    assert db.query(RevokedToken).count() == 1
+
+def test_load_prunes_expired_rows(db):
+    add_row(db, "live")
+    add_row(db, "expired", expires_at=NOW - timedelta(seconds=1))
+    revocations = RevocationList()
+    assert revocations.load(db) == 1
+    assert revocations.is_revoked("live") and not revocations.is_revoked("expired")
+    assert [row.jti for row in db.query(RevokedToken)] == ["live"]
+
+def test_sync_follows_the_id_cursor(db):
+    revocations = RevocationList()
+    revocations.load(db)
+    add_row(db, "first")
+    add_row(db, "second")
+    assert revocations.sync(db) == 2
+    assert revocations.is_revoked("first") and revocations.is_revoked("second")
+    assert revocations.sync(db) == 0
+
+def test_sync_rereads_the_overlap_window(db):
+    add_row(db, "seen", row_id=10)
+    revocations = RevocationList()
+    revocations.load(db)
+    # Committed late with ids below the cursor: one recent, one older than the overlap
+    add_row(db, "late", row_id=5)
+    add_row(db, "stale", row_id=6, revoked_at=NOW - timedelta(seconds=settings.revocation_sync_overlap + 60))
+    assert revocations.sync(db) == 1
+    assert revocations.is_revoked("late") and not revocations.is_revoked("stale")
+
+def test_background_sync_prunes(session_factory):
+    original = settings.model_copy()
+    configure(Settings(revocation_sync_interval=0.01, revocation_prune_interval=0.0))
+    db = session_factory()
+    revocations = RevocationList()
+    try:
+        revocations.start(session_factory)
+        add_row(db, "expired", expires_at=NOW - timedelta(seconds=1))
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            db.expire_all()
+            if db.query(RevokedToken).count() == 0:
+                break
+            time.sleep(0.01)
+        assert db.query(RevokedToken).count() == 0
+        assert not revocations.is_revoked("expired")
+    finally:
+        revocations.stop()
+        db.close()
+        configure(original)
@@ -0,0 +1,69 @@
+import os
+import signal
+import pytest
+from fastapi import HTTPException
+from app.core import security
+from app.core.config import Settings, configure, settings
+from app.core.security import ConcurrencyGuard, get_hash_pool, get_password_hash, verify_and_update_password
+from app.models import User
+from app.services.services import UserService
+
+@pytest.fixture
+def fast_hashing():
+    original = settings.model_copy()
+    configure(Settings(bcrypt_rounds=4, password_hash_workers=1))
+    yield
+    configure(original)
+    security.shutdown_hash_pool()
+
+def test_configure_changes_the_cost_factor(fast_hashing):
+    old_hash = get_password_hash("secret")
+    assert old_hash.startswith("$2b$04$")
+    configure(Settings(bcrypt_rounds=5, password_hash_workers=1))
+    assert get_password_hash("secret").startswith("$2b$05$")
+    valid, new_hash = verify_and_update_password("secret", old_hash)
+    assert valid and new_hash.startswith("$2b$05$")
+    assert verify_and_update_password("wrong", old_hash) == (False, None)
+
+def test_login_rehashes_with_the_new_cost_factor(fast_hashing, session_factory):
+    db = session_factory()
+    user = db.get(User, 1)
+    user.hashed_password = get_password_hash("secret")
+    db.commit()
+    configure(Settings(bcrypt_rounds=5, password_hash_workers=1))
+    assert UserService.authenticate_user(db, user.email, "secret").id == 1
+    db.expire_all()
+    assert db.get(User, 1).hashed_password.startswith("$2b$05$")
+    assert UserService.authenticate_user(db, user.email, "wrong") is None
+    db.close()
+
+def test_broken_pool_is_replaced(fast_hashing):
+    pool = get_hash_pool()
+    get_password_hash("warm up")
+    for process in list(pool._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+    assert get_password_hash("secret").startswith("$2b$04$")
+    assert get_hash_pool() is not pool
+
+def test_guard_acquires_every_key_or_none():
+    guard = ConcurrencyGuard(1)
+    assert guard.try_acquire("account:a", "ip:1")
+    assert not guard.try_acquire("account:b", "ip:1")
+    # The refused attempt took no slot for account:b
+    assert guard.try_acquire("account:b", "ip:2")
+    guard.release("account:a", "ip:1")
+    guard.release("account:b", "ip:2")
+    assert guard._in_flight == {}
+
+def test_guard_raises_429_and_releases_on_error():
+    guard = ConcurrencyGuard(1)
+    with pytest.raises(ValueError):
+        with guard.guard("ip:1"):
+            with pytest.raises(HTTPException) as error:
+                with guard.guard("ip:1"):
+                    pass
+            assert error.value.status_code == 429
+            assert error.value.headers["Retry-After"] == "1"
+            raise ValueError
+    assert guard.try_acquire("ip:1")
@@ -0,0 +1,59 @@
+from datetime import datetime
+import orjson
+from app.models import Interview, InterviewStatus, Problem, ProblemStats
+from app.schemas import InterviewResponse, ProblemResponse
+from app.core.serialization import RowSerializer
+
+def make_problem(problem_id: int, stats: bool = True) -> Problem:
+    problem = Problem(
+        id=problem_id,
+        title=f"Problem {problem_id}",
+        description="Add two numbers",
+        difficulty="easy",
+        tags=["math"],
+        sample_input="1 2",
+        sample_output="3",
+        test_cases=[
+            {"input_ref": "a" * 64, "output_ref": "b" * 64, "hidden": False},
+            {"input_ref": "c" * 64, "output_ref": "d" * 64, "hidden": True},
+        ],
+        created_at=datetime(2024, 1, 2, 3, 4, 5),
+    )
+    if stats:
+        problem.stats = ProblemStats(
+            submissions=4, accepted=1, language_counts={"python": 4},
+            runtime_histogram={"12": 1}, median_runtime=0.012,
+        )
+    return problem
+
+def pydantic_json(schema, row) -> object:
+    return orjson.loads(schema.model_validate(row).model_dump_json())
+
+def test_matches_the_response_schema():
+    serializer = RowSerializer(ProblemResponse)
+    for problem in (make_problem(1), make_problem(2, stats=False)):
+        assert orjson.loads(orjson.dumps(serializer.one(problem))) == pydantic_json(ProblemResponse, problem)
+
+def test_hidden_test_cases_keep_no_blob_refs():
+    data = RowSerializer(ProblemResponse).one(make_problem(1))
+    assert data["test_cases"][1] == {"hidden": True}
+    assert data["stats"]["acceptance_rate"] == 25.0
+
+def test_enums_are_plain_values():
+    interview = Interview(
+        id=1, interviewer_id=2, candidate_id=3, problem_id=4,
+        status=InterviewStatus.ONGOING, scheduled_at=datetime(2024, 1, 1),
+        created_at=datetime(2024, 1, 1),
+    )
+    data = RowSerializer(InterviewResponse).one(interview)
+    assert data["status"] == InterviewStatus.ONGOING.value
+    assert orjson.loads(orjson.dumps(data)) == pydantic_json(InterviewResponse, interview)
+
+def test_iter_json_is_one_array_in_batches():
+    serializer = RowSerializer(ProblemResponse)
+    problems = [make_problem(i) for i in range(5)]
+    chunks = list(serializer.iter_json(iter(problems), batch_size=2))
+    # "[", three batches, "]"
+    assert len(chunks) == 5
+    assert orjson.loads(b"".join(chunks)) == orjson.loads(orjson.dumps(serializer.many(problems)))
+    assert b"".join(serializer.iter_json(iter([]))) == b"[]"
@@ -0,0 +1,31 @@
+import logging
+import os
+import pytest
+from app.core.config import Settings, configure, settings
+from app.server import check_workers, worker_count
+
+@pytest.fixture
+def configured():
+    original = settings.model_copy()
+    yield lambda **values: configure(Settings(**values))
+    configure(original)
+
+def test_in_process_pubsub_defaults_to_one_worker(configured):
+    configured(pubsub_backend="memory")
+    assert worker_count() == 1
+    configured(pubsub_backend="redis")
+    assert worker_count() == len(os.sched_getaffinity(0))
+    configured(pubsub_backend="redis", server_workers=3)
+    assert worker_count() == 3
+
+def test_workers_without_shared_pubsub_are_refused(configured):
+    configured(pubsub_backend="memory", server_workers=4)
+    with pytest.raises(SystemExit, match="PUBSUB_BACKEND=redis"):
+        check_workers(worker_count())
+    check_workers(1)
+
+def test_per_worker_rate_limits_are_reported(configured, caplog):
+    configured(pubsub_backend="redis", rate_limit_backend="memory")
+    with caplog.at_level(logging.WARNING, logger="app.server"):
+        check_workers(4)
+    assert "up to 4 times" in caplog.text
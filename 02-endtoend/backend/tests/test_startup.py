@@ -0,0 +1,25 @@
+import os
+from benchmarks.startup import time_to_first_request
+
+# Generous default for CI machines; tighten locally with STARTUP_BUDGET_SECONDS
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5.0"))
+
+def test_time_to_first_request_within_budget():
+    elapsed = time_to_first_request()
+    assert elapsed < STARTUP_BUDGET_SECONDS, (
+        f"cold start took {elapsed:.2f}s (budget {STARTUP_BUDGET_SECONDS:.2f}s); "
+        "run `python -m benchmarks.startup` to find the slow imports"
+    )
+
+def test_importing_app_main_is_cheap():
+    import subprocess
+    import sys
+    from benchmarks.startup import BACKEND_DIR
+    
+    # Importing the module must not pull in the ORM, jose or passlib
+    code = (
+        "import sys, app.main; "
+        "heavy = [m for m in ('sqlalchemy', 'jose', 'passlib') if m in sys.modules]; "
+        "assert not heavy, heavy"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, check=True)
@@ -4,13 +4,12 @@ Serves backend API and frontend static files
 """
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import os
 from pathlib import Path
 from typing import Optional
+from static_assets import IndexHtml, StaticAssets
 
 # Create FastAPI app
 app = FastAPI(title="Coding Interview Platform API")
@@ -352,31 +351,37 @@ async def execute_code(interview_id: int, data: CodeExecute):
         "executionTime": 123.45
     }
 
-# Health check endpoint
-@app.get("/health")
-async def health():
-    return {"status": "ok"}
+# Built frontend: frontend/dist locally, ./public in the Docker image
+frontend_path = next(
+    (
+        path for path in (
+            Path(__file__).parent / "frontend" / "dist",
+            Path(__file__).parent / "public",
+        )
+        if (path / "index.html").exists()
+    ),
+    None,
+)
+static_assets = StaticAssets(frontend_path) if frontend_path else None
+index_html = IndexHtml(frontend_path / "index.html") if frontend_path else None
 
-# Catch-all route for SPA (must be before static mount)
+# Catch-all route: static files, then the SPA fallback
 @app.get("/{full_path:path}")
-async def catch_all(full_path: str):
-    """Serve index.html for all unknown routes (SPA fallback)"""
+async def catch_all(full_path: str, request: Request):
+    """Serve built assets, or index.html for all unknown routes (SPA fallback)"""
     if full_path.startswith("api/"):
         # API routes should return 404
         raise HTTPException(status_code=404, detail="Not found")
-    # For all other routes, serve the SPA
-    frontend_path = Path(__file__).parent / "frontend" / "dist" / "index.html"
-    if frontend_path.exists():
-        return FileResponse(frontend_path)
-    raise HTTPException(status_code=404, detail="Frontend not found")
-
-# Mount static files (built React frontend)
-# Must be done AFTER route definitions
-frontend_path = Path(__file__).parent / "frontend" / "dist"
-if frontend_path.exists():
-    app.mount("/", StaticFiles(directory=str(frontend_path), html=True), name="static")
+    if static_assets is None:
+        raise HTTPException(status_code=404, detail="Frontend not found")
+    file_path = static_assets.resolve(full_path) if full_path else None
+    if file_path is not None and file_path.name != "index.html":
+        return static_assets.response(request, file_path)
+    return index_html.response(request)
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 5000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Single process unless WEB_CONCURRENCY asks for more
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers)
@@ -0,0 +1,197 @@
+"""
+Static file serving for the built React frontend
+
+Hashed bundles are served with immutable caching, precompressed .br/.gz
+siblings are preferred when the client accepts them, and index.html is held
+in memory (with its compressed variants) and reloaded when it changes.
+
+Generate the compressed siblings at build time with:
+
+    python static_assets.py frontend/dist
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Vite writes bundles to assets/ as name-<8 character hash>.ext, e.g.
+# assets/index-BP4hXMN3.js; files copied from public/ keep their own names
+ASSETS_DIR = "assets"
+HASHED_ASSET = re.compile(r"-[A-Za-z0-9_-]{8}\.[^.]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = {".js", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".wasm"}
+
+def _accepts(request: Request, encoding: str) -> bool:
+    """Whether Accept-Encoding allows encoding (q=0 refuses it)
+
+    Same rules as the backend's CompressionMiddleware, except that an
+    explicit entry for the encoding takes precedence over "*". This image
+    ships without the backend package, so the parser lives here too.
+    """
+    wildcard = False
+    for item in request.headers.get("accept-encoding", "").lower().split(","):
+        name, _, params = item.partition(";")
+        name = name.strip()
+        if name not in (encoding, "*"):
+            continue
+        params = params.strip()
+        allowed = True
+        if params.startswith("q="):
+            try:
+                allowed = float(params[2:]) > 0
+            except ValueError:
+                allowed = False
+        if name == encoding:
+            return allowed
+        wildcard = allowed
+    return wildcard
+
+def _variant_etag(etag: str, encoding: str) -> str:
+    # Each encoding is a different representation, so it needs its own validator
+    return etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    return bool(if_none_match) and (if_none_match == "*" or etag in if_none_match)
+
+class StaticAssets:
+    """Serves files below root with compression and caching headers"""
+    
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        self._meta: Dict[str, Tuple[int, str]] = {}  # path -> (mtime_ns, etag)
+    
+    def resolve(self, path: str) -> Optional[Path]:
+        """Map a URL path to a file inside root, or None"""
+        candidate = (self.root / path.lstrip("/")).resolve()
+        if candidate == self.root or self.root not in candidate.parents:
+            return None
+        return candidate if candidate.is_file() else None
+    
+    def _etag(self, file_path: Path) -> str:
+        stat = file_path.stat()
+        cached = self._meta.get(str(file_path))
+        if cached and cached[0] == stat.st_mtime_ns:
+            return cached[1]
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        self._meta[str(file_path)] = (stat.st_mtime_ns, etag)
+        return etag
+    
+    def _variant(self, request: Request, file_path: Path) -> Tuple[str, Path]:
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if _accepts(request, encoding):
+                compressed = file_path.with_name(file_path.name + suffix)
+                if compressed.is_file():
+                    return encoding, compressed
+        return "identity", file_path
+    
+    def _immutable(self, file_path: Path) -> bool:
+        relative = file_path.relative_to(self.root)
+        return relative.parts[0] == ASSETS_DIR and bool(HASHED_ASSET.search(file_path.name))
+    
+    def response(self, request: Request, file_path: Path) -> Response:
+        encoding, body_path = self._variant(request, file_path)
+        etag = _variant_etag(self._etag(file_path), encoding)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE if self._immutable(file_path) else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        return FileResponse(body_path, headers=headers, media_type=_media_type(file_path))
+
+class IndexHtml:
+    """index.html kept in memory, with compressed variants, reloaded on change"""
+    
+    # Seconds between mtime checks, so most requests never touch the disk
+    CHECK_INTERVAL = 1.0
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._checked_at = 0.0
+        self._variants: Dict[str, bytes] = {}
+        self.etag = ""
+    
+    def _load(self) -> bool:
+        """Refresh from disk if due; False when there is nothing to serve"""
+        now = time.monotonic()
+        if now - self._checked_at < self.CHECK_INTERVAL and self._variants:
+            return True
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime_ns = self.path.stat().st_mtime_ns
+                if mtime_ns == self._mtime_ns:
+                    return True
+                body = self.path.read_bytes()
+            except FileNotFoundError:
+                # Mid-deploy the file can vanish briefly: keep serving the last copy
+                return bool(self._variants)
+            variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+            if brotli is not None:
+                variants["br"] = brotli.compress(body)
+            self._variants = variants
+            self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            self._mtime_ns = mtime_ns
+            return True
+    
+    def response(self, request: Request) -> Response:
+        if not self._load():
+            raise HTTPException(status_code=404, detail="Frontend not found")
+        variants = self._variants
+        encoding = next(
+            (name for name in ("br", "gzip") if name in variants and _accepts(request, name)),
+            "identity",
+        )
+        etag = _variant_etag(self.etag, encoding)
+        headers = {"ETag": etag, "Cache-Control": REVALIDATE, "Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(variants[encoding], headers=headers, media_type="text/html")
+
+def _media_type(file_path: Path) -> Optional[str]:
+    return mimetypes.guess_type(file_path.name)[0]
+
+def precompress(root: Path, min_size: int = 1024) -> int:
+    """Write .gz (and .br when available) next to every compressible file"""
+    written = 0
+    for file_path in root.rglob("*"):
+        if not file_path.is_file() or file_path.suffix not in COMPRESSIBLE:
+            continue
+        body = file_path.read_bytes()
+        if len(body) < min_size:
+            continue
+        outputs = [(".gz", gzip.compress(body, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            outputs.append((".br", brotli.compress(body, quality=11)))
+        for suffix, data in outputs:
+            if len(data) < len(body):
+                file_path.with_name(file_path.name + suffix).write_bytes(data)
+                written += 1
+    return written
+
+if __name__ == "__main__":
+    for directory in sys.argv[1:] or ["frontend/dist"]:
+        count = precompress(Path(directory))
+        print(f"{directory}: wrote {count} compressed files")
@@ -0,0 +1,97 @@
+import gzip
+import pytest
+from fastapi import HTTPException, Request
+from static_assets import IndexHtml, StaticAssets, _accepts, precompress
+
+def request(accept_encoding: str = "", if_none_match: str = None) -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())]
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+@pytest.fixture
+def dist(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-BP4hXMN3.js").write_text("console.log('app');" * 200)
+    (tmp_path / "assets" / "my-component.css").write_text("body{}")
+    (tmp_path / "site-manifest.json").write_text("{}")
+    (tmp_path / "apple-touch-icon.png").write_bytes(b"png")
+    (tmp_path / "index.html").write_text("<html>" + "<div></div>" * 200 + "</html>")
+    precompress(tmp_path)
+    return tmp_path
+
+@pytest.mark.parametrize("header, encoding, expected", [
+    ("gzip", "gzip", True),
+    ("br;q=1.0, gzip;q=0.5", "gzip", True),
+    ("gzip;q=0", "gzip", False),
+    ("*", "gzip", True),
+    ("*, gzip;q=0", "gzip", False),  # an explicit entry beats the wildcard
+    ("gzip;q=0, *", "gzip", False),
+    ("deflate", "gzip", False),
+    ("", "gzip", False),
+])
+def test_accepts(header, encoding, expected):
+    assert _accepts(request(header), encoding) is expected
+
+@pytest.mark.parametrize("path, cache_control", [
+    ("assets/index-BP4hXMN3.js", "public, max-age=31536000, immutable"),
+    ("assets/my-component.css", "no-cache"),
+    ("site-manifest.json", "no-cache"),  # eight letters, but not under assets/
+    ("apple-touch-icon.png", "no-cache"),
+])
+def test_only_hashed_bundles_are_immutable(dist, path, cache_control):
+    assets = StaticAssets(dist)
+    response = assets.response(request(), assets.resolve(path))
+    assert response.headers["cache-control"] == cache_control
+
+def test_resolve_stays_inside_root(dist):
+    assets = StaticAssets(dist)
+    assert assets.resolve("../" + dist.name + "/index.html") == dist / "index.html"
+    assert assets.resolve("../../etc/passwd") is None
+    assert assets.resolve("assets") is None
+    assert assets.resolve("missing.js") is None
+
+def test_compressed_variant_has_its_own_etag(dist):
+    assets = StaticAssets(dist)
+    file_path = assets.resolve("assets/index-BP4hXMN3.js")
+    plain = assets.response(request(), file_path)
+    gzipped = assets.response(request("gzip"), file_path)
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert str(gzipped.path) == str(file_path) + ".gz"
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+    assert gzipped.headers["etag"].endswith('-gzip"')
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+
+def test_not_modified_only_for_the_same_encoding(dist):
+    assets = StaticAssets(dist)
+    file_path = assets.resolve("assets/index-BP4hXMN3.js")
+    etag = assets.response(request("gzip"), file_path).headers["etag"]
+    assert assets.response(request("gzip", if_none_match=etag), file_path).status_code == 304
+    # The identity representation does not match the gzip validator
+    assert assets.response(request("", if_none_match=etag), file_path).status_code == 200
+
+def test_index_html_variants_and_304(dist):
+    index = IndexHtml(dist / "index.html")
+    plain = index.response(request())
+    gzipped = index.response(request("gzip;q=0.8"))
+    assert plain.body == (dist / "index.html").read_bytes()
+    assert gzip.decompress(gzipped.body) == plain.body
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+    assert index.response(request("gzip", if_none_match=gzipped.headers["etag"])).status_code == 304
+    assert index.response(request("gzip;q=0", if_none_match=gzipped.headers["etag"])).status_code == 200
+
+def test_index_html_reloads_and_survives_removal(dist):
+    index = IndexHtml(dist / "index.html")
+    index.CHECK_INTERVAL = 0
+    first = index.response(request()).headers["etag"]
+    (dist / "index.html").write_text("<html>new</html>")
+    assert index.response(request()).body == b"<html>new</html>"
+    assert index.response(request()).headers["etag"] != first
+    (dist / "index.html").unlink()
+    assert index.response(request()).body == b"<html>new</html>"
+
+def test_missing_index_html_is_404(tmp_path):
+    with pytest.raises(HTTPException) as error:
+        IndexHtml(tmp_path / "index.html").response(request())
+    assert error.value.status_code == 404